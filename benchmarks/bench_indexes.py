@@ -0,0 +1,127 @@
+#!/usr/bin/python3
+"""This module benchmarks point updates and filtered listings before and after adding the tasks indexes.
+
+It seeds a scratch copy of the tasks table (dropped afterwards), so it is safe to point at a development database:
+
+    python benchmarks/bench_indexes.py --rows=1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+import psycopg2
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TABLE: str = "tasks_index_benchmark"
+STATUSES: tuple = ("NOT STARTED", "STARTED", "COMPLETED")
+
+
+def seed_table(cursor, rows: int):
+    """Creates the scratch table without any keys or indexes and fills it with generated tasks.
+    :param cursor: A cursor on an autocommit connection.
+    :param rows: The number of tasks to generate.
+    :return: None
+    """
+    cursor.execute(f"DROP TABLE IF EXISTS {TABLE};")
+    cursor.execute(f"CREATE TABLE {TABLE} (LIKE tasks INCLUDING IDENTITY);")
+    cursor.execute(
+        f"INSERT INTO {TABLE} (task, task_status, task_date_and_time, task_status_date_and_time) "
+        "SELECT 'Benchmark task ' || n, (ARRAY['NOT STARTED', 'STARTED', 'COMPLETED'])[1 + n % 3], "
+        "now() - n * interval '1 minute', NULL FROM generate_series(1, %s) AS n;", (rows,))
+    cursor.execute(f"ANALYZE {TABLE};")
+
+
+def add_indexes(cursor):
+    """Adds the same primary key and indexes as migration 003 to the scratch table.
+    :param cursor: A cursor on an autocommit connection.
+    :return: None
+    """
+    cursor.execute(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (task_id);")
+    cursor.execute(f"CREATE INDEX ON {TABLE} (task_status, task_id);")
+    cursor.execute(f"CREATE INDEX ON {TABLE} (task_date_and_time);")
+    cursor.execute(f"ANALYZE {TABLE};")
+
+
+def time_queries(cursor, query: str, parameter_sets: list) -> dict:
+    """Runs a query once per parameter set and summarizes the latencies.
+    :param cursor: A cursor on an autocommit connection.
+    :param query: The SQL to time.
+    :param parameter_sets: One parameter tuple per execution.
+    :return: A dict with the p50, p99, and mean latency in milliseconds.
+    """
+    latencies: list = []
+    for parameters in parameter_sets:
+        start_time: float = time.perf_counter()
+        cursor.execute(query, parameters)
+        if cursor.description:
+            cursor.fetchall()
+        latencies.append((time.perf_counter() - start_time) * 1000)
+    latencies.sort()
+    return {
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+    }
+
+
+def run_workload(cursor, rows: int, iterations: int) -> dict:
+    """Times the query shapes used by cli.py against the scratch table.
+    :param cursor: A cursor on an autocommit connection.
+    :param rows: The number of rows in the scratch table.
+    :param iterations: How many times each query is executed.
+    :return: A dict of results keyed by query name.
+    """
+    task_ids: list = [(random.randint(1, rows),) for _ in range(iterations)]
+    return {
+        "update_status_by_id": time_queries(
+            cursor, f"UPDATE {TABLE} SET task_status = 'STARTED', task_status_date_and_time = now() "
+                    "WHERE task_id = %s;", task_ids),
+        "delete_missing_id": time_queries(
+            cursor, f"DELETE FROM {TABLE} WHERE task_id = %s;", [(rows + task_id,) for (task_id,) in task_ids]),
+        "list_by_status_first_page": time_queries(
+            cursor, f"SELECT * FROM {TABLE} WHERE task_status = %s ORDER BY task_id LIMIT 100;",
+            [(random.choice(STATUSES),) for _ in range(iterations)]),
+        "list_added_last_day": time_queries(
+            cursor, f"SELECT count(*) FROM {TABLE} WHERE task_date_and_time > now() - interval '1 day';",
+            [()] * iterations),
+    }
+
+
+def main():
+    """Seeds the scratch table, times the workload without and with indexes, and prints the comparison."""
+    arguments_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arguments_parser.add_argument("--rows", type=int, default=1_000_000, help="Rows to seed (Default: 1000000)")
+    arguments_parser.add_argument("--iterations", type=int, default=20,
+                                  help="Executions per query and phase (Default: 20)")
+    arguments = arguments_parser.parse_args()
+
+    connection = psycopg2.connect(
+        dbname=os.getenv("TASKDB_NAME"),
+        user=os.getenv("TASKDB_USER"),
+        password=os.getenv("TASKDB_PASSWORD"),
+        host=os.getenv("TASKDB_HOST"),
+        port=os.getenv("TASKDB_PORT")
+    )
+    connection.autocommit = True
+    try:
+        with connection.cursor() as cursor:
+            print(f"Seeding {arguments.rows:,} rows into \"{TABLE}\"...")
+            seed_table(cursor, arguments.rows)
+            before: dict = run_workload(cursor, arguments.rows, arguments.iterations)
+            add_indexes(cursor)
+            after: dict = run_workload(cursor, arguments.rows, arguments.iterations)
+            cursor.execute(f"DROP TABLE {TABLE};")
+    finally:
+        connection.close()
+
+    print(f"{'Query':<28}{'p50 before':>14}{'p50 after':>14}{'p99 before':>14}{'p99 after':>14}")
+    for query_name in before:
+        print(f"{query_name:<28}{before[query_name]['p50_ms']:>12.3f}ms{after[query_name]['p50_ms']:>12.3f}ms"
+              f"{before[query_name]['p99_ms']:>12.3f}ms{after[query_name]['p99_ms']:>12.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
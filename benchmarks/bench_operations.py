@@ -0,0 +1,297 @@
+#!/usr/bin/python3
+"""This module benchmarks the CLI's task operations against a disposable local PostgreSQL server.
+
+It creates a throwaway cluster in a temporary directory with initdb and pg_ctl, applies data/schema.sql and the
+migrations, then for each table size seeds the tasks table and measures throughput and p50/p99 latency of every task
+operation and listing filter. The cluster is deleted afterwards, and the results are written as JSON so runs can be
+compared over time:
+
+    python benchmarks/bench_operations.py --sizes=10000,100000,1000000 --output=results.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT_DIRECTORY: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_DIRECTORY: str = os.path.join(ROOT_DIRECTORY, "src")
+SCHEMA_PATH: str = os.path.join(ROOT_DIRECTORY, "data", "schema.sql")
+
+DATABASE_NAME: str = "taskdb"
+DATABASE_USER: str = "taskdb"
+
+# The same filters as --lall, --s, --c, and --n.
+LISTING_FILTERS: dict = {"lall": None, "s": "STARTED", "c": "COMPLETED", "n": "NOT STARTED"}
+
+
+def find_postgres_binary(name: str, binary_directory: str | None) -> str:
+    """Locates a PostgreSQL server program such as initdb or pg_ctl.
+    :param name: The program's name.
+    :param binary_directory: An optional directory to look in first (Default: PATH, then `pg_config --bindir`).
+    :return: The program's pathname.
+    """
+    if not binary_directory and shutil.which(name):
+        return shutil.which(name)
+    if not binary_directory:
+        try:
+            binary_directory = subprocess.run(["pg_config", "--bindir"], capture_output=True, text=True,
+                                              check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            binary_directory = ""
+    program: str = os.path.join(binary_directory, name)
+    if not os.access(program, os.X_OK):
+        raise SystemExit(f"Error: Could not find \"{name}\". Install the PostgreSQL server or pass --pg-bin.")
+    return program
+
+
+def find_free_port() -> int:
+    """Asks the OS for a TCP port that is free right now.
+    :return: A port number.
+    """
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+class DisposableCluster:
+    """A PostgreSQL cluster that lives in a temporary directory for the duration of a with block."""
+
+    def __init__(self, binary_directory: str | None = None):
+        """Finds the server programs. Nothing is created until the with block is entered.
+        :param binary_directory: An optional directory holding initdb and pg_ctl.
+        """
+        self.initdb = find_postgres_binary("initdb", binary_directory)
+        self.pg_ctl = find_postgres_binary("pg_ctl", binary_directory)
+        self.directory: str | None = None
+        self.port: int = find_free_port()
+
+    def __enter__(self):
+        """Initializes and starts the cluster, listening only on a Unix socket inside the temporary directory.
+        :return: The cluster.
+        """
+        self.directory = tempfile.mkdtemp(prefix="taskdb-bench-")
+        data_directory: str = os.path.join(self.directory, "data")
+        subprocess.run([self.initdb, "-D", data_directory, "-U", DATABASE_USER, "--auth=trust", "--no-sync"],
+                       check=True, capture_output=True)
+        server_options: str = f"-k {self.directory} -p {self.port} -c listen_addresses='' -c fsync=off " \
+                              "-c synchronous_commit=off -c full_page_writes=off"
+        try:
+            subprocess.run([self.pg_ctl, "-D", data_directory, "-o", server_options, "-l",
+                            os.path.join(self.directory, "server.log"), "-w", "start"], check=True,
+                           capture_output=True)
+        except subprocess.CalledProcessError:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            raise
+        return self
+
+    def __exit__(self, *exception_info):
+        """Stops the cluster and deletes its directory.
+        :return: None
+        """
+        subprocess.run([self.pg_ctl, "-D", os.path.join(self.directory, "data"), "-m", "immediate", "stop"],
+                       capture_output=True)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def environment(self) -> dict:
+        """Builds the TASKDB_* variables that point TaskDB at this cluster.
+        :return: A dict of environment variables.
+        """
+        return {"TASKDB_NAME": DATABASE_NAME, "TASKDB_USER": DATABASE_USER, "TASKDB_PASSWORD": "",
+                "TASKDB_HOST": self.directory, "TASKDB_PORT": str(self.port), "TASKDB_BACKEND": "postgresql"}
+
+
+def prepare_database(cluster: DisposableCluster):
+    """Creates the taskdb database, applies schema.sql, and runs every migration.
+    :param cluster: A running DisposableCluster.
+    :return: None
+    """
+    import psycopg2
+    from taskdb.migrate import apply_pending_migrations
+
+    connection = psycopg2.connect(dbname="postgres", user=DATABASE_USER, host=cluster.directory, port=cluster.port)
+    connection.autocommit = True
+    with connection.cursor() as cursor:
+        cursor.execute(f"CREATE DATABASE {DATABASE_NAME};")
+    connection.close()
+
+    connection = psycopg2.connect(dbname=DATABASE_NAME, user=DATABASE_USER, host=cluster.directory,
+                                  port=cluster.port)
+    try:
+        with connection.cursor() as cursor, open(SCHEMA_PATH, "r") as schema_file:
+            cursor.execute(schema_file.read())
+        connection.commit()
+        apply_pending_migrations(connection)
+    finally:
+        connection.close()
+
+
+def seed_tasks(rows: int):
+    """Replaces the contents of the tasks table with generated tasks spread evenly over the three statuses.
+    :param rows: The number of tasks to generate.
+    :return: None
+    """
+    from taskdb.pool import borrow_connection
+
+    with borrow_connection() as connection:
+        with connection:
+            with connection.cursor() as cursor:
+                cursor.execute("TRUNCATE tasks RESTART IDENTITY;")
+                cursor.execute(
+                    "INSERT INTO tasks (task, task_status, task_date_and_time, task_status_date_and_time) "
+                    "SELECT 'Benchmark task ' || n, (ARRAY['NOT STARTED', 'STARTED', 'COMPLETED'])[1 + n % 3], "
+                    "now() - n * interval '1 minute', now() - n * interval '30 seconds' "
+                    "FROM generate_series(1, %s) AS n;", (rows,))
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute("VACUUM ANALYZE tasks;")
+        connection.autocommit = False
+
+
+def summarize(latencies: list, rows_read: int = 0) -> dict:
+    """Summarizes the latencies of one operation.
+    :param latencies: The latency of each call in seconds.
+    :param rows_read: The total number of rows the calls returned, for listings.
+    :return: A dict with the call count, throughput, and p50/p99/mean latency in milliseconds.
+    """
+    latencies = sorted(latencies)
+    total_seconds: float = sum(latencies)
+    summary: dict = {
+        "calls": len(latencies),
+        "ops_per_second": round(len(latencies) / total_seconds, 1) if total_seconds else None,
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+    }
+    if rows_read:
+        summary["rows_per_second"] = round(rows_read / total_seconds, 1) if total_seconds else None
+    return summary
+
+
+def time_calls(operation, arguments: list) -> dict:
+    """Calls an operation once per argument tuple and summarizes the latencies.
+    :param operation: A callable. If it returns a list, its length counts as rows read.
+    :param arguments: One argument tuple per call.
+    :return: A dict from summarize.
+    """
+    latencies: list = []
+    rows_read: int = 0
+    for call_arguments in arguments:
+        start_time: float = time.perf_counter()
+        result = operation(*call_arguments)
+        latencies.append(time.perf_counter() - start_time)
+        if isinstance(result, list):
+            rows_read += len(result)
+    return summarize(latencies, rows_read)
+
+
+def run_operations(rows: int, iterations: int, page_size: int, full_scans: int) -> dict:
+    """Times each task operation the CLI offers through TaskRepository, against a table of the given size.
+    :param rows: The number of seeded tasks.
+    :param iterations: Calls per operation.
+    :param page_size: The --limit used for the paged listings.
+    :param full_scans: Calls per unpaged listing, which read the whole matching table.
+    :return: A dict of results keyed by operation name.
+    """
+    from taskdb.repository import TaskRepository
+
+    repository = TaskRepository(cache=None)
+    random_ids: list = random.sample(range(1, rows + 1), min(rows, iterations * 3))
+    status_ids, update_ids, delete_ids = (random_ids[index::3] for index in range(3))
+    results: dict = {}
+
+    for option, status_filter in LISTING_FILTERS.items():
+        results[f"list_{option}_first_page"] = time_calls(
+            repository.list_tasks, [(status_filter, page_size)] * iterations)
+        results[f"list_{option}_after_id_page"] = time_calls(
+            repository.list_tasks, [(status_filter, page_size, None, random.randint(1, rows))
+                                    for _ in range(iterations)])
+        results[f"list_{option}_offset_page"] = time_calls(
+            repository.list_tasks, [(status_filter, page_size, random.randint(0, rows // 4))
+                                    for _ in range(iterations)])
+        if full_scans:
+            results[f"list_{option}_full"] = time_calls(repository.list_tasks, [(status_filter,)] * full_scans)
+
+    results["add"] = time_calls(repository.add_task, [(f"Benchmark added task {n}",) for n in range(iterations)])
+    results["status"] = time_calls(repository.add_tasks_status,
+                                   [([task_id], random.choice(("started", "completed"))) for task_id in status_ids])
+    results["status_batch_100"] = time_calls(
+        repository.add_tasks_status, [(random.sample(range(1, rows + 1), 100), "completed")
+                                      for _ in range(iterations)])
+    results["update"] = time_calls(repository.update_tasks_description,
+                                   [([task_id], "Benchmark updated task") for task_id in update_ids])
+    results["delete"] = time_calls(repository.delete_tasks, [([task_id],) for task_id in delete_ids])
+    return results
+
+
+def main():
+    """Starts the disposable cluster, benchmarks every table size, and writes the JSON results."""
+    arguments_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arguments_parser.add_argument("--sizes", default="10000,100000,1000000",
+                                  help="Comma-separated table sizes to seed (Default: 10000,100000,1000000)")
+    arguments_parser.add_argument("--iterations", type=int, default=200,
+                                  help="Calls per operation and size (Default: 200)")
+    arguments_parser.add_argument("--page-size", type=int, default=100,
+                                  help="The --limit used for paged listings (Default: 100)")
+    arguments_parser.add_argument("--full-scans", type=int, default=3,
+                                  help="Calls per unpaged listing; 0 skips them (Default: 3)")
+    arguments_parser.add_argument("--pg-bin", help="The directory holding initdb and pg_ctl (Default: PATH)")
+    arguments_parser.add_argument("--output", default=os.path.join(
+        ROOT_DIRECTORY, "benchmarks", "results", f"operations-{datetime.now():%Y%m%d-%H%M%S}.json"),
+                                  help="The JSON results file (Default: benchmarks/results/operations-<time>.json)")
+    arguments = arguments_parser.parse_args()
+    sizes: list = [int(size) for size in arguments.sizes.split(",")]
+
+    sys.path.insert(0, SOURCE_DIRECTORY)
+    with DisposableCluster(arguments.pg_bin) as cluster:
+        # Set before TaskDB is imported, so the pool connects to the disposable cluster instead of the .env database.
+        os.environ.update(cluster.environment())
+        print(f"Started a disposable PostgreSQL cluster in {cluster.directory}.")
+        prepare_database(cluster)
+
+        from taskdb.pool import borrow_connection, close_connection_pool
+        with borrow_connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("SHOW server_version;")
+                server_version: str = cursor.fetchone()[0]
+            connection.rollback()
+
+        results: dict = {}
+        for rows in sizes:
+            print(f"Seeding {rows:,} tasks...")
+            seed_tasks(rows)
+            print(f"Timing operations at {rows:,} tasks...")
+            results[str(rows)] = run_operations(rows, arguments.iterations, arguments.page_size, arguments.full_scans)
+        close_connection_pool()
+
+    report: dict = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python_version": platform.python_version(),
+        "postgresql_version": server_version,
+        "platform": platform.platform(),
+        "settings": {"iterations": arguments.iterations, "page_size": arguments.page_size,
+                     "full_scans": arguments.full_scans},
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(arguments.output)), exist_ok=True)
+    with open(arguments.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+    print(f"{'Operation':<28}{'Rows':>10}{'ops/s':>12}{'p50':>12}{'p99':>12}")
+    for rows, operations in results.items():
+        for operation_name, summary in operations.items():
+            print(f"{operation_name:<28}{int(rows):>10,}{summary['ops_per_second'] or 0:>12.1f}"
+                  f"{summary['p50_ms']:>10.3f}ms{summary['p99_ms']:>10.3f}ms")
+    print(f"Results written to {arguments.output}")
+
+
+if __name__ == "__main__":
+    main()
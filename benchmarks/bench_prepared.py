@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+"""This module measures what server-side prepared statements save on the fixed task queries under sustained load.
+
+It uses the same disposable PostgreSQL cluster as bench_operations.py. It seeds the tasks table, then runs a steady mix
+of the fixed statements (add, status update, description update, delete, and the tasks_version check) over one
+connection. Each statement runs as plain SQL and again through taskdb.prepared, one transaction per call as the CLI
+does. It reports the server's planning time per call (from EXPLAIN's summary) and the client-side latency of each mode:
+
+    python benchmarks/bench_prepared.py --rows=100000 --iterations=5000
+"""
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_operations import (SOURCE_DIRECTORY, DisposableCluster, prepare_database, seed_tasks,  # noqa: E402
+                              summarize)
+
+PLANNING_TIME_PATTERN = re.compile(r"Planning Time: ([\d.]+) ms")
+
+
+def statement_mix(rows: int) -> list:
+    """Lists the fixed statements with a function that generates parameters for each call.
+    :param rows: The number of seeded tasks.
+    :return: A list of (name, query, parameter generator) tuples.
+    """
+    from taskdb import queries
+    return [
+        ("add", queries.ADD_TASK, lambda: ("Benchmark prepared task",)),
+        ("status", queries.UPDATE_TASKS_STATUS, lambda: ("STARTED", [random.randint(1, rows)])),
+        ("update", queries.UPDATE_TASKS_DESCRIPTION, lambda: ("Benchmark updated task", [random.randint(1, rows)])),
+        ("delete_missing", queries.DELETE_TASKS, lambda: ([rows * 10 + random.randint(1, rows)],)),
+        ("tasks_version", queries.TASKS_VERSION, lambda: ()),
+    ]
+
+
+def connect(cluster: DisposableCluster, prepared: bool):
+    """Opens a connection to the benchmark database.
+    :param cluster: A running DisposableCluster.
+    :param prepared: Whether to use taskdb.prepared.PreparingConnection.
+    :return: A psycopg2 connection.
+    """
+    import psycopg2
+    from taskdb.prepared import PreparingConnection
+    options: dict = {"connection_factory": PreparingConnection} if prepared else {}
+    return psycopg2.connect(dbname="taskdb", user="taskdb", host=cluster.directory, port=cluster.port, **options)
+
+
+def run_sustained(connection, mix: list, iterations: int) -> dict:
+    """Runs the statement mix round-robin, one transaction per call, and times each call.
+    :param connection: A psycopg2 connection.
+    :param mix: The list from statement_mix.
+    :param iterations: Calls per statement.
+    :return: A dict of summarize() results keyed by statement name.
+    """
+    latencies: dict = {name: [] for name, _, _ in mix}
+    for _ in range(iterations):
+        for name, query, make_parameters in mix:
+            start_time: float = time.perf_counter()
+            with connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(query, make_parameters() or None)
+                    cursor.fetchall()
+            latencies[name].append(time.perf_counter() - start_time)
+    return {name: summarize(statement_latencies) for name, statement_latencies in latencies.items()}
+
+
+def planning_times(connection, mix: list, samples: int, prepared: bool) -> dict:
+    """Reads the server's planning time for each statement from EXPLAIN (SUMMARY), without running it.
+    :param connection: A psycopg2 connection. For prepared statements it must already have run the mix, so the
+                       server has settled on its cached plan.
+    :param mix: The list from statement_mix.
+    :param samples: EXPLAINs per statement.
+    :param prepared: Whether to explain EXECUTE of the prepared statement instead of the plain SQL.
+    :return: A dict of median planning milliseconds keyed by statement name.
+    """
+    from taskdb.prepared import EXECUTE_STATEMENTS
+    medians: dict = {}
+    with connection.cursor() as cursor:
+        for name, query, make_parameters in mix:
+            statement: str = EXECUTE_STATEMENTS[query] if prepared else query
+            times: list = []
+            for _ in range(samples):
+                cursor.execute(f"EXPLAIN (SUMMARY) {statement.rstrip(';')}", make_parameters() or None)
+                plan: str = "\n".join(line for (line,) in cursor.fetchall())
+                times.append(float(PLANNING_TIME_PATTERN.search(plan).group(1)))
+            medians[name] = round(statistics.median(times), 4)
+    connection.rollback()
+    return medians
+
+
+def main():
+    """Starts the disposable cluster, measures both modes, and prints and saves the comparison."""
+    arguments_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arguments_parser.add_argument("--rows", type=int, default=100_000, help="Rows to seed (Default: 100000)")
+    arguments_parser.add_argument("--iterations", type=int, default=5000,
+                                  help="Calls per statement and mode (Default: 5000)")
+    arguments_parser.add_argument("--explain-samples", type=int, default=50,
+                                  help="EXPLAINs per statement and mode (Default: 50)")
+    arguments_parser.add_argument("--pg-bin", help="The directory holding initdb and pg_ctl (Default: PATH)")
+    arguments_parser.add_argument("--output", help="An optional JSON file for the results")
+    arguments = arguments_parser.parse_args()
+
+    sys.path.insert(0, SOURCE_DIRECTORY)
+    with DisposableCluster(arguments.pg_bin) as cluster:
+        os.environ.update(cluster.environment())
+        prepare_database(cluster)
+        print(f"Seeding {arguments.rows:,} tasks...")
+        seed_tasks(arguments.rows)
+        mix: list = statement_mix(arguments.rows)
+
+        results: dict = {}
+        for mode, prepared in (("plain", False), ("prepared", True)):
+            print(f"Running {arguments.iterations:,} calls per statement ({mode})...")
+            connection = connect(cluster, prepared)
+            try:
+                wall_start: float = time.perf_counter()
+                latency: dict = run_sustained(connection, mix, arguments.iterations)
+                wall_seconds: float = time.perf_counter() - wall_start
+                results[mode] = {
+                    "statements_per_second": round(arguments.iterations * len(mix) / wall_seconds, 1),
+                    "planning_ms": planning_times(connection, mix, arguments.explain_samples, prepared),
+                    "latency": latency,
+                }
+            finally:
+                connection.close()
+
+    print(f"{'Statement':<18}{'plan plain':>14}{'plan prepared':>16}{'p50 plain':>14}{'p50 prepared':>15}")
+    for name, _, _ in mix:
+        print(f"{name:<18}{results['plain']['planning_ms'][name]:>12.4f}ms"
+              f"{results['prepared']['planning_ms'][name]:>14.4f}ms"
+              f"{results['plain']['latency'][name]['p50_ms']:>12.3f}ms"
+              f"{results['prepared']['latency'][name]['p50_ms']:>13.3f}ms")
+    saved_ms: float = sum(results["plain"]["planning_ms"][name] - results["prepared"]["planning_ms"][name]
+                          for name, _, _ in mix) * arguments.iterations
+    print(f"Throughput: {results['plain']['statements_per_second']:,.0f} statements/s plain, "
+          f"{results['prepared']['statements_per_second']:,.0f} statements/s prepared")
+    print(f"Planning time saved over {arguments.iterations * len(mix):,} calls: {saved_ms:,.1f}ms")
+
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as file:
+            json.dump({"rows": arguments.rows, "iterations": arguments.iterations, "results": results}, file,
+                      indent=2)
+
+
+if __name__ == "__main__":
+    main()
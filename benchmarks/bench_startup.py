@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+"""This module checks TaskDB's cold-start cost against an import-time budget.
+
+It runs the CLI's --help path in fresh interpreters with `python -X importtime`, reports the slowest imports, and exits
+with status 1 if the budget is exceeded or if the database driver gets imported on that path:
+
+    python benchmarks/bench_startup.py --budget-ms=40
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SOURCE_DIRECTORY: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# Modules that must never be imported just to parse arguments or print help.
+FORBIDDEN_MODULES: tuple = ("psycopg2", "dotenv")
+
+STARTUP_SCRIPT: str = "import sys; sys.argv = ['taskdb', '--help']; from taskdb.cli import main; main()"
+
+
+def run_importtime() -> list:
+    """Runs the --help path once with -X importtime.
+    :return: A list of (cumulative microseconds, module name) tuples, one per imported module.
+    """
+    environment: dict = dict(os.environ, PYTHONPATH=SOURCE_DIRECTORY)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT],
+                            capture_output=True, text=True, env=environment, check=True)
+    imports: list = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module_name = line[len("import time:"):].split("|")
+        imports.append((int(cumulative), module_name.strip()))
+    return imports
+
+
+def time_process(runs: int) -> float:
+    """Measures the median wall-clock time of the whole --help process.
+    :param runs: How many fresh processes to start.
+    :return: The median wall-clock time in milliseconds.
+    """
+    environment: dict = dict(os.environ, PYTHONPATH=SOURCE_DIRECTORY)
+    durations: list = []
+    for _ in range(runs):
+        start_time: float = time.perf_counter()
+        subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], stdout=subprocess.DEVNULL, env=environment,
+                       check=True)
+        durations.append((time.perf_counter() - start_time) * 1000)
+    return statistics.median(durations)
+
+
+def main():
+    """Reports the import cost of the --help path and enforces the budget."""
+    arguments_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arguments_parser.add_argument("--budget-ms", type=float, default=40.0,
+                                  help="Maximum import time of taskdb.cli and its dependencies (Default: 40)")
+    arguments_parser.add_argument("--runs", type=int, default=5, help="Fresh processes to time (Default: 5)")
+    arguments = arguments_parser.parse_args()
+
+    imports: list = run_importtime()
+    taskdb_cumulative_us: int = sum(cumulative for cumulative, module_name in imports
+                                    if module_name in ("taskdb", "taskdb.cli"))
+    forbidden: list = sorted({module_name for _, module_name in imports
+                              if module_name.split(".")[0] in FORBIDDEN_MODULES})
+
+    print("Slowest imports on the --help path:")
+    for cumulative, module_name in sorted(imports, reverse=True)[:10]:
+        print(f"  {cumulative / 1000:8.2f}ms  {module_name}")
+    print(f"taskdb.cli import time: {taskdb_cumulative_us / 1000:.2f}ms (budget {arguments.budget_ms:.2f}ms)")
+    print(f"Median `taskdb --help` process time: {time_process(arguments.runs):.2f}ms")
+
+    failed: bool = False
+    if forbidden:
+        print(f"FAIL: --help imported {', '.join(forbidden)}")
+        failed = True
+    if taskdb_cumulative_us / 1000 > arguments.budget_ms:
+        print("FAIL: import-time budget exceeded")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
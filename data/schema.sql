@@ -4,5 +4,10 @@ CREATE TABLE IF NOT EXISTS tasks (
     task text NOT NULL,
     task_status text NULL,
     task_date_and_time timestamptz NULL,
-    task_status_date_and_time timestamptz NULL
-);
\ No newline at end of file
+    task_status_date_and_time timestamptz NULL,
+    CONSTRAINT tasks_pkey PRIMARY KEY (task_id)
+);
+
+-- Serve the task_id lookups, the ordered status listings, and date range scans
+CREATE INDEX IF NOT EXISTS tasks_task_status_task_id_idx ON tasks (task_status, task_id);
+CREATE INDEX IF NOT EXISTS tasks_task_date_and_time_idx ON tasks (task_date_and_time);
@@ -1,8 +1,30 @@
-from TaskDB.src.taskdb.cli import *
-from TaskDB.src.taskdb.commands import *
-from TaskDB.src.taskdb.database import *
-
-__all__ = ["get_db_connection", "list_tasks", "add_task", "delete_task", "add_task_status", "update_task_description",
-           "main", "parser", "subparsers", "add_parser", "delete_parser", "task_status_parser", "update_task_parser",
-           "args", "check_if_db_exists", "create_database_if_not_exists",
-           "apply_schema"]
+from importlib import import_module
+
+# Submodules are imported on first attribute access so that importing the package doesn't load psycopg2 or python-dotenv.
+_EXPORTS: dict = {
+    "main": "cli",
+    "build_parser": "commands", "parse_task_ids": "commands",
+    "get_db_connection": "tasks", "list_tasks": "tasks", "add_task": "tasks", "delete_task": "tasks",
+    "delete_tasks": "tasks", "add_task_status": "tasks", "add_tasks_status": "tasks",
+    "update_task_description": "tasks", "update_tasks_description": "tasks", "import_tasks": "tasks",
+    "export_tasks": "tasks", "search_tasks": "tasks", "show_stats": "tasks",
+    "watch_tasks": "tasks", "archive_tasks": "tasks",
+    "check_if_db_exists": "database", "create_database_if_not_exists": "database", "apply_schema": "database",
+    "get_connection_pool": "pool", "close_connection_pool": "pool", "is_connection_healthy": "pool",
+    "borrow_connection": "pool",
+    "TaskRepository": "repository", "Task": "records", "MutationResult": "records",
+    "TaskStats": "records", "TaskChange": "records",
+    "get_backend": "backends", "PostgresBackend": "backends", "SQLiteBackend": "backends",
+    "UnsupportedOperationError": "backends",
+    "migrate": "migrate", "apply_pending_migrations": "migrate",
+    "serve": "server", "run_shell": "server",
+    "render_tasks": "render",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(f"TaskDB.src.taskdb.{_EXPORTS[name]}"), name)
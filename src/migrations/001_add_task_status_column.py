@@ -8,6 +8,24 @@ from dotenv import load_dotenv
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 load_dotenv()
 
+from taskdb.migrate import backfill_in_batches
+
+# The backfill commits batch by batch, so this migration runs outside the runner's shared transaction.
+TRANSACTIONAL: bool = False
+
+
+def upgrade(connection):
+    """Adds the task_status column and backfills existing rows.
+    :param connection: A database connection in autocommit mode.
+    :return: None
+    """
+    with connection.cursor() as cursor:
+        create_task_status_column = "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS task_status text DEFAULT NULL;"
+        print("Executing: ", create_task_status_column)
+        cursor.execute(create_task_status_column)
+
+    backfill_in_batches(connection, "tasks", "task_status = 'No status'", "task_status IS NULL")
+
 
 def apply_migration():
     """Applies the migration to add the task_status column to the tasks table."""
@@ -21,21 +39,11 @@ def apply_migration():
             host=os.getenv("TASKDB_HOST"),
             port=os.getenv("TASKDB_PORT")
         )
-        with connection.cursor() as cursor:
-            create_task_status_column = "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS task_status text DEFAULT NULL;"
-            print("Executing: ", create_task_status_column)
-            cursor.execute(create_task_status_column)
-
-            set_default_task_status = "UPDATE tasks SET task_status = 'No status' WHERE task_status IS NULL;"
-            print("Executing: ", set_default_task_status)
-            cursor.execute(set_default_task_status)
-
-        connection.commit()
+        connection.autocommit = True
+        upgrade(connection)
         print("Migration applied successfully: \"task_status\" column added to \"tasks\" table.")
     except psycopg2.Error as error:
         print(f"Error applying migration: {error}")
-        if connection:
-            connection.rollback()
     finally:
         if connection:
             connection.close()
@@ -8,6 +8,33 @@ from dotenv import load_dotenv
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 load_dotenv()
 
+from taskdb.migrate import backfill_in_batches
+
+# The backfills commit batch by batch, so this migration runs outside the runner's shared transaction.
+TRANSACTIONAL: bool = False
+
+
+def upgrade(connection):
+    """Adds the task_date_and_time and task_status_date_and_time columns and backfills both in one pass per batch.
+    :param connection: A database connection in autocommit mode.
+    :return: None
+    """
+    with connection.cursor() as cursor:
+        create_task_date_column = "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS task_date_and_time timestamptz DEFAULT NULL;"
+        print("Executing: ", create_task_date_column)
+        cursor.execute(create_task_date_column)
+
+        create_task_status_date_column = "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS task_status_date_and_time timestamptz DEFAULT NULL;"
+        print("Executing: ", create_task_status_date_column)
+        cursor.execute(create_task_status_date_column)
+
+    # One UPDATE per batch fills both columns, so each row is rewritten once instead of twice.
+    backfill_in_batches(
+        connection, "tasks",
+        "task_date_and_time = COALESCE(task_date_and_time, '2025-01-01 12:00 UTC'), "
+        "task_status_date_and_time = COALESCE(task_status_date_and_time, '2025-01-01 12:00 UTC')",
+        "task_date_and_time IS NULL OR task_status_date_and_time IS NULL")
+
 
 def apply_migration():
     """Applies the migration to add the task_date column to the tasks table."""
@@ -21,30 +48,12 @@ def apply_migration():
             host=os.getenv("TASKDB_HOST"),
             port=os.getenv("TASKDB_PORT")
         )
-        with connection.cursor() as cursor:
-            create_task_date_column = "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS task_date_and_time timestamptz DEFAULT NULL;"
-            print("Executing: ", create_task_date_column)
-            cursor.execute(create_task_date_column)
-
-            set_default_task_date = "UPDATE tasks SET task_date_and_time = '2025-01-01 12:00 UTC' WHERE task_date_and_time IS NULL;"
-            print("Executing: ", set_default_task_date)
-            cursor.execute(set_default_task_date)
-
-            create_task_status_date_column = "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS task_status_date_and_time timestamptz DEFAULT NULL;"
-            print("Executing: ", create_task_status_date_column)
-            cursor.execute(create_task_status_date_column)
-
-            set_default_task_status_date = "UPDATE tasks SET task_status_date_and_time = '2025-01-01 12:00 UTC' WHERE task_status_date_and_time IS NULL;"
-            print("Executing: ", set_default_task_status_date)
-            cursor.execute(set_default_task_status_date)
-
-        connection.commit()
+        connection.autocommit = True
+        upgrade(connection)
         print(
             "Migration applied successfully: \"task_date_and_time\" and \"task_status_date_and_time\" columns added to \"tasks\" table.")
     except psycopg2.Error as error:
         print(f"Error applying migration: {error}")
-        if connection:
-            connection.rollback()
     finally:
         if connection:
             connection.close()
@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+"""This module adds the primary key and the task_status/date indexes to the "tasks" database."""
+import os, sys
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from dotenv import load_dotenv
+
+# This ensures the script can find the project's root for imports if needed and for loading the .env file correctly.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+load_dotenv()
+
+# CREATE INDEX CONCURRENTLY cannot run inside a transaction block, so every statement runs in autocommit mode and the
+# table stays writable while the indexes are built.
+TRANSACTIONAL: bool = False
+
+INDEX_STATEMENTS: list = [
+    "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS tasks_pkey ON tasks (task_id);",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS tasks_task_status_task_id_idx ON tasks (task_status, task_id);",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS tasks_task_date_and_time_idx ON tasks (task_date_and_time);",
+]
+
+
+# The indexes this migration builds. Only these are dropped when invalid: an invalid index could also be one another
+# session is still building concurrently, or one an operator left in place on purpose.
+MIGRATION_INDEXES: tuple = ("tasks_pkey", "tasks_task_status_task_id_idx", "tasks_task_date_and_time_idx")
+
+
+def drop_invalid_indexes(cursor):
+    """Drops this migration's indexes if an interrupted CREATE INDEX CONCURRENTLY left them INVALID, so they can be
+    rebuilt.
+    :param cursor: A cursor on an autocommit connection.
+    :return: None
+    """
+    cursor.execute(
+        "SELECT index_class.relname FROM pg_index "
+        "JOIN pg_class AS index_class ON index_class.oid = pg_index.indexrelid "
+        "WHERE pg_index.indrelid = 'tasks'::regclass AND NOT pg_index.indisvalid "
+        "AND index_class.relname = ANY(%s);", (list(MIGRATION_INDEXES),))
+    for (index_name,) in cursor.fetchall():
+        print(f"Dropping invalid index \"{index_name}\" left by an earlier run...")
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS \"{index_name}\";")
+
+
+def upgrade(connection):
+    """Builds the indexes concurrently and promotes the unique task_id index to the primary key.
+    :param connection: A database connection in autocommit mode.
+    :return: None
+    """
+    with connection.cursor() as cursor:
+        drop_invalid_indexes(cursor)
+
+        for index_statement in INDEX_STATEMENTS:
+            print("Executing: ", index_statement)
+            cursor.execute(index_statement)
+
+        # Promoting the prebuilt unique index only takes a brief lock instead of scanning the table again.
+        cursor.execute("SELECT 1 FROM pg_constraint WHERE conrelid = 'tasks'::regclass AND contype = 'p';")
+        if cursor.fetchone() is None:
+            add_primary_key = "ALTER TABLE tasks ADD CONSTRAINT tasks_pkey PRIMARY KEY USING INDEX tasks_pkey;"
+            print("Executing: ", add_primary_key)
+            cursor.execute(add_primary_key)
+
+        cursor.execute("ANALYZE tasks;")
+
+
+def apply_migration():
+    """Applies the migration to add the primary key and indexes to the tasks table."""
+    connection = None
+    try:
+        print("Connecting to the database to apply migration...")
+        connection = psycopg2.connect(
+            dbname=os.getenv("TASKDB_NAME"),
+            user=os.getenv("TASKDB_USER"),
+            password=os.getenv("TASKDB_PASSWORD"),
+            host=os.getenv("TASKDB_HOST"),
+            port=os.getenv("TASKDB_PORT")
+        )
+        connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        upgrade(connection)
+        print("Migration applied successfully: primary key and indexes added to \"tasks\" table.")
+    except psycopg2.Error as error:
+        print(f"Error applying migration: {error}")
+    finally:
+        if connection:
+            connection.close()
+
+
+if __name__ == "__main__":
+    apply_migration()
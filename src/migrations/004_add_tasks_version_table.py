@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+"""This module adds the tasks_version counter, bumped by a trigger on every change to the "tasks" table."""
+import os, sys
+import psycopg2
+from dotenv import load_dotenv
+
+# This ensures the script can find the project's root for imports if needed and for loading the .env file correctly.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+load_dotenv()
+
+MIGRATION_STATEMENTS: list = [
+    "CREATE TABLE IF NOT EXISTS tasks_version (singleton boolean PRIMARY KEY DEFAULT true CHECK (singleton), "
+    "version bigint NOT NULL DEFAULT 0);",
+    "INSERT INTO tasks_version (singleton, version) VALUES (true, 0) ON CONFLICT (singleton) DO NOTHING;",
+    "CREATE OR REPLACE FUNCTION bump_tasks_version() RETURNS trigger LANGUAGE plpgsql AS $$ "
+    "BEGIN UPDATE tasks_version SET version = version + 1; RETURN NULL; END; $$;",
+    "DROP TRIGGER IF EXISTS tasks_version_bump ON tasks;",
+    # A statement-level trigger bumps the counter once per statement, not once per row.
+    "CREATE TRIGGER tasks_version_bump AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON tasks "
+    "FOR EACH STATEMENT EXECUTE FUNCTION bump_tasks_version();",
+]
+
+
+def upgrade(connection):
+    """Creates the tasks_version table and the trigger that bumps it.
+    :param connection: A database connection. The caller commits.
+    :return: None
+    """
+    with connection.cursor() as cursor:
+        for migration_statement in MIGRATION_STATEMENTS:
+            print("Executing: ", migration_statement)
+            cursor.execute(migration_statement)
+
+
+def apply_migration():
+    """Applies the migration to add the tasks_version table and its trigger."""
+    connection = None
+    try:
+        print("Connecting to the database to apply migration...")
+        connection = psycopg2.connect(
+            dbname=os.getenv("TASKDB_NAME"),
+            user=os.getenv("TASKDB_USER"),
+            password=os.getenv("TASKDB_PASSWORD"),
+            host=os.getenv("TASKDB_HOST"),
+            port=os.getenv("TASKDB_PORT")
+        )
+        upgrade(connection)
+        connection.commit()
+        print("Migration applied successfully: \"tasks_version\" table and trigger added to \"tasks\" table.")
+    except psycopg2.Error as error:
+        print(f"Error applying migration: {error}")
+        if connection:
+            connection.rollback()
+    finally:
+        if connection:
+            connection.close()
+
+
+if __name__ == "__main__":
+    apply_migration()
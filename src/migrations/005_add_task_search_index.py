@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+"""This module adds the full-text search column and indexes used by `taskdb search` to the "tasks" database."""
+import os, sys
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from dotenv import load_dotenv
+
+# This ensures the script can find the project's root for imports if needed and for loading the .env file correctly.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+load_dotenv()
+
+# The GIN indexes are built with CREATE INDEX CONCURRENTLY, which cannot run inside a transaction block.
+TRANSACTIONAL: bool = False
+
+# A stored generated column keeps the tsvector in step with the description without any trigger.
+ADD_SEARCH_COLUMN: str = "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS task_search tsvector " \
+                         "GENERATED ALWAYS AS (to_tsvector('english', task)) STORED;"
+
+SEARCH_INDEX: str = "CREATE INDEX CONCURRENTLY IF NOT EXISTS tasks_task_search_idx ON tasks USING gin (task_search);"
+
+# Trigram matching is optional: it needs the pg_trgm extension, which not every role may create.
+TRIGRAM_INDEX: str = "CREATE INDEX CONCURRENTLY IF NOT EXISTS tasks_task_trgm_idx ON tasks " \
+                     "USING gin (task gin_trgm_ops);"
+
+
+def drop_invalid_search_indexes(cursor):
+    """Drops search indexes left INVALID by an interrupted CREATE INDEX CONCURRENTLY so they can be rebuilt.
+    :param cursor: A cursor on an autocommit connection.
+    :return: None
+    """
+    cursor.execute(
+        "SELECT index_class.relname FROM pg_index "
+        "JOIN pg_class AS index_class ON index_class.oid = pg_index.indexrelid "
+        "WHERE pg_index.indrelid = 'tasks'::regclass AND NOT pg_index.indisvalid "
+        "AND index_class.relname IN ('tasks_task_search_idx', 'tasks_task_trgm_idx');")
+    for (index_name,) in cursor.fetchall():
+        print(f"Dropping invalid index \"{index_name}\" left by an earlier run...")
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS \"{index_name}\";")
+
+
+def upgrade(connection):
+    """Adds the generated task_search column, its GIN index, and, if pg_trgm is available, a trigram index.
+    :param connection: A database connection in autocommit mode.
+    :return: None
+    """
+    with connection.cursor() as cursor:
+        drop_invalid_search_indexes(cursor)
+
+        for statement in (ADD_SEARCH_COLUMN, SEARCH_INDEX):
+            print("Executing: ", statement)
+            cursor.execute(statement)
+
+        try:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+        except psycopg2.Error as error:
+            print(f"Skipping the trigram index, so `taskdb search --fuzzy` won't be available: {error}")
+        else:
+            print("Executing: ", TRIGRAM_INDEX)
+            cursor.execute(TRIGRAM_INDEX)
+
+        cursor.execute("ANALYZE tasks;")
+
+
+def apply_migration():
+    """Applies the migration to add the full-text search column and indexes to the tasks table."""
+    connection = None
+    try:
+        print("Connecting to the database to apply migration...")
+        connection = psycopg2.connect(
+            dbname=os.getenv("TASKDB_NAME"),
+            user=os.getenv("TASKDB_USER"),
+            password=os.getenv("TASKDB_PASSWORD"),
+            host=os.getenv("TASKDB_HOST"),
+            port=os.getenv("TASKDB_PORT")
+        )
+        connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        upgrade(connection)
+        print("Migration applied successfully: search column and indexes added to \"tasks\" table.")
+    except psycopg2.Error as error:
+        print(f"Error applying migration: {error}")
+    finally:
+        if connection:
+            connection.close()
+
+
+if __name__ == "__main__":
+    apply_migration()
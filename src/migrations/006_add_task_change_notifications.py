@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+"""This module adds the triggers that announce every change to the "tasks" table with NOTIFY, for `taskdb watch`."""
+import os, sys
+import psycopg2
+from dotenv import load_dotenv
+
+# This ensures the script can find the project's root for imports if needed and for loading the .env file correctly.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+load_dotenv()
+
+# Statements changing more rows than this send one summary notification instead of one per row, so a large import
+# can't flood the notification queue.
+MAX_ROW_NOTIFICATIONS: int = 1000
+
+NOTIFY_FUNCTION: str = f"""
+CREATE OR REPLACE FUNCTION notify_task_changes() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    changed_count bigint;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        SELECT count(*) INTO changed_count FROM old_rows;
+    ELSE
+        SELECT count(*) INTO changed_count FROM new_rows;
+    END IF;
+
+    IF changed_count > {MAX_ROW_NOTIFICATIONS} THEN
+        PERFORM pg_notify('taskdb_task_changes', json_build_object('operation', TG_OP, 'task_id', NULL,
+            'task_status', NULL, 'count', changed_count)::text);
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('taskdb_task_changes', json_build_object('operation', TG_OP, 'task_id', task_id,
+            'task_status', task_status, 'count', 1)::text) FROM old_rows;
+    ELSE
+        PERFORM pg_notify('taskdb_task_changes', json_build_object('operation', TG_OP, 'task_id', task_id,
+            'task_status', task_status, 'count', 1)::text) FROM new_rows;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+MIGRATION_STATEMENTS: list = [
+    NOTIFY_FUNCTION,
+    "DROP TRIGGER IF EXISTS tasks_notify_insert ON tasks;",
+    "DROP TRIGGER IF EXISTS tasks_notify_update ON tasks;",
+    "DROP TRIGGER IF EXISTS tasks_notify_delete ON tasks;",
+    # Statement-level triggers see every changed row through their transition table, so they can tell a bulk change
+    # from a small one. A trigger with a transition table may only fire on one kind of event, hence three of them.
+    "CREATE TRIGGER tasks_notify_insert AFTER INSERT ON tasks REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION notify_task_changes();",
+    "CREATE TRIGGER tasks_notify_update AFTER UPDATE ON tasks REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION notify_task_changes();",
+    "CREATE TRIGGER tasks_notify_delete AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION notify_task_changes();",
+]
+
+
+def upgrade(connection):
+    """Creates the notify_task_changes function and its triggers.
+    :param connection: A database connection. The caller commits.
+    :return: None
+    """
+    with connection.cursor() as cursor:
+        for migration_statement in MIGRATION_STATEMENTS:
+            print("Executing: ", migration_statement.strip())
+            cursor.execute(migration_statement)
+
+
+def apply_migration():
+    """Applies the migration to add the change notification triggers to the tasks table."""
+    connection = None
+    try:
+        print("Connecting to the database to apply migration...")
+        connection = psycopg2.connect(
+            dbname=os.getenv("TASKDB_NAME"),
+            user=os.getenv("TASKDB_USER"),
+            password=os.getenv("TASKDB_PASSWORD"),
+            host=os.getenv("TASKDB_HOST"),
+            port=os.getenv("TASKDB_PORT")
+        )
+        upgrade(connection)
+        connection.commit()
+        print("Migration applied successfully: change notification triggers added to \"tasks\" table.")
+    except psycopg2.Error as error:
+        print(f"Error applying migration: {error}")
+    finally:
+        if connection:
+            connection.close()
+
+
+if __name__ == "__main__":
+    apply_migration()
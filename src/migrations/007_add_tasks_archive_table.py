@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+"""This module adds the "tasks_archive" table that `taskdb archive` moves old completed tasks into."""
+import os, sys
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from dotenv import load_dotenv
+
+# This ensures the script can find the project's root for imports if needed and for loading the .env file correctly.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+load_dotenv()
+
+# The index on "tasks" is built with CREATE INDEX CONCURRENTLY, which cannot run inside a transaction block.
+TRANSACTIONAL: bool = False
+
+# The same columns as "tasks", so archived rows keep their task numbers and dates, plus when they were archived.
+# There are no triggers on this table: archiving already bumps tasks_version and notifies through "tasks".
+CREATE_ARCHIVE_TABLE: str = "CREATE TABLE IF NOT EXISTS tasks_archive (task_id integer PRIMARY KEY, " \
+                            "task text NOT NULL, task_status text NULL, task_date_and_time timestamptz NULL, " \
+                            "task_status_date_and_time timestamptz NULL, " \
+                            "archived_at timestamptz NOT NULL DEFAULT now());"
+
+# Lets archive batches find the oldest completed tasks without scanning every completed row. Built concurrently, so the
+# large tables that need archiving stay writable while it runs.
+COMPLETED_INDEX: str = "CREATE INDEX CONCURRENTLY IF NOT EXISTS tasks_completed_status_date_idx ON tasks " \
+                       "(task_status_date_and_time) WHERE task_status = 'COMPLETED';"
+
+
+def drop_invalid_completed_index(cursor):
+    """Drops the index if an interrupted CREATE INDEX CONCURRENTLY left it INVALID, so it can be rebuilt.
+    :param cursor: A cursor on an autocommit connection.
+    :return: None
+    """
+    cursor.execute(
+        "SELECT index_class.relname FROM pg_index "
+        "JOIN pg_class AS index_class ON index_class.oid = pg_index.indexrelid "
+        "WHERE pg_index.indrelid = 'tasks'::regclass AND NOT pg_index.indisvalid "
+        "AND index_class.relname = 'tasks_completed_status_date_idx';")
+    for (index_name,) in cursor.fetchall():
+        print(f"Dropping invalid index \"{index_name}\" left by an earlier run...")
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS \"{index_name}\";")
+
+
+def upgrade(connection):
+    """Creates the tasks_archive table and the partial index archiving uses.
+    :param connection: A database connection in autocommit mode.
+    :return: None
+    """
+    with connection.cursor() as cursor:
+        drop_invalid_completed_index(cursor)
+        for statement in (CREATE_ARCHIVE_TABLE, COMPLETED_INDEX):
+            print("Executing: ", statement)
+            cursor.execute(statement)
+
+
+def apply_migration():
+    """Applies the migration to add the tasks_archive table."""
+    connection = None
+    try:
+        print("Connecting to the database to apply migration...")
+        connection = psycopg2.connect(
+            dbname=os.getenv("TASKDB_NAME"),
+            user=os.getenv("TASKDB_USER"),
+            password=os.getenv("TASKDB_PASSWORD"),
+            host=os.getenv("TASKDB_HOST"),
+            port=os.getenv("TASKDB_PORT")
+        )
+        connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        upgrade(connection)
+        print("Migration applied successfully: \"tasks_archive\" table added.")
+    except psycopg2.Error as error:
+        print(f"Error applying migration: {error}")
+    finally:
+        if connection:
+            connection.close()
+
+
+if __name__ == "__main__":
+    apply_migration()
@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+"""This module adds a random generation id to the tasks_version counter, so cached listings can tell databases apart."""
+import os, sys
+import psycopg2
+from dotenv import load_dotenv
+
+# This ensures the script can find the project's root for imports if needed and for loading the .env file correctly.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+load_dotenv()
+
+MIGRATION_STATEMENTS: list = [
+    # Every database counts tasks_version up from 0, so the version alone can't tell one database (or a recreated one)
+    # from another. The generation is random per database and is checked together with the version.
+    "ALTER TABLE tasks_version ADD COLUMN IF NOT EXISTS generation text NOT NULL "
+    "DEFAULT md5(random()::text || clock_timestamp()::text);",
+]
+
+
+def upgrade(connection):
+    """Adds the generation column to tasks_version.
+    :param connection: A database connection. The caller commits.
+    :return: None
+    """
+    with connection.cursor() as cursor:
+        for migration_statement in MIGRATION_STATEMENTS:
+            print("Executing: ", migration_statement)
+            cursor.execute(migration_statement)
+
+
+def apply_migration():
+    """Applies the migration to add the generation column to the tasks_version table."""
+    connection = None
+    try:
+        print("Connecting to the database to apply migration...")
+        connection = psycopg2.connect(
+            dbname=os.getenv("TASKDB_NAME"),
+            user=os.getenv("TASKDB_USER"),
+            password=os.getenv("TASKDB_PASSWORD"),
+            host=os.getenv("TASKDB_HOST"),
+            port=os.getenv("TASKDB_PORT")
+        )
+        upgrade(connection)
+        connection.commit()
+        print("Migration applied successfully: \"generation\" column added to \"tasks_version\" table.")
+    except psycopg2.Error as error:
+        print(f"Error applying migration: {error}")
+        if connection:
+            connection.rollback()
+    finally:
+        if connection:
+            connection.close()
+
+
+if __name__ == "__main__":
+    apply_migration()
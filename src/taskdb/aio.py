@@ -0,0 +1,195 @@
+#!/usr/bin/python3
+"""This module contains the asyncio task operations, built on psycopg 3 and its async connection pool.
+
+Unlike the functions in tasks.py, these return records instead of printing, so an asyncio service can run many
+operations concurrently over a handful of shared connections:
+
+    from taskdb import aio
+
+    async def handler():
+        tasks = await aio.list_tasks("STARTED")
+        await aio.close_async_pool()
+"""
+import asyncio
+import os
+from dotenv import load_dotenv
+from . import queries
+from .records import Task, MutationResult
+
+try:
+    from psycopg.conninfo import make_conninfo
+    from psycopg_pool import AsyncConnectionPool
+except ImportError as error:
+    raise ImportError("The asyncio API needs psycopg 3. Install it with: pip install \"TaskDB[async]\"") from error
+
+# Load environment variables from .env file
+load_dotenv()
+
+# One pool, and one lock guarding it, per event loop. A pool's connections and locks belong to the loop that opened
+# them, so a later asyncio.run() in the same process gets a pool of its own instead of one tied to a closed loop.
+_async_pools: dict = {}
+_async_pool_locks: dict = {}
+
+
+def _pool_lock(loop) -> asyncio.Lock:
+    """Returns the lock guarding an event loop's pool, forgetting the pools and locks of loops that have closed.
+    :param loop: The running event loop.
+    :return: An asyncio.Lock.
+    """
+    for closed_loop in [other_loop for other_loop in _async_pool_locks if other_loop.is_closed()]:
+        _async_pool_locks.pop(closed_loop)
+        _async_pools.pop(closed_loop, None)
+    if loop not in _async_pool_locks:
+        _async_pool_locks[loop] = asyncio.Lock()
+    return _async_pool_locks[loop]
+
+
+async def get_async_pool() -> AsyncConnectionPool:
+    """Returns the running event loop's async connection pool, opening it on first use. It is sized by the same
+    TASKDB_POOL_* variables as the synchronous pool and checks each connection before handing it out.
+    :return: An open AsyncConnectionPool connected to the taskdb database.
+    """
+    loop = asyncio.get_running_loop()
+    async with _pool_lock(loop):
+        async_pool: AsyncConnectionPool | None = _async_pools.get(loop)
+        if async_pool is None or async_pool.closed:
+            conninfo: str = make_conninfo(**{key: value for key, value in {
+                "dbname": os.getenv("TASKDB_NAME"),
+                "user": os.getenv("TASKDB_USER"),
+                "password": os.getenv("TASKDB_PASSWORD"),
+                "host": os.getenv("TASKDB_HOST"),
+                "port": os.getenv("TASKDB_PORT"),
+            }.items() if value})
+            async_pool = _async_pools[loop] = AsyncConnectionPool(
+                conninfo,
+                min_size=int(os.getenv("TASKDB_POOL_MIN_SIZE", "1")),
+                max_size=int(os.getenv("TASKDB_POOL_MAX_SIZE", "10")),
+                check=AsyncConnectionPool.check_connection,
+                open=False,
+            )
+            await async_pool.open()
+        return async_pool
+
+
+async def close_async_pool():
+    """Closes the running event loop's async connection pool. The next operation on this loop opens a new one.
+    :return: None
+    """
+    loop = asyncio.get_running_loop()
+    async with _pool_lock(loop):
+        async_pool: AsyncConnectionPool | None = _async_pools.pop(loop, None)
+        if async_pool is not None:
+            await async_pool.close()
+
+
+async def iter_tasks(status_filter: str | None = None, limit: int | None = None, offset: int | None = None,
+                     after_id: int | None = None, itersize: int = 2000):
+    """Streams tasks through a server-side cursor without loading the whole result into memory.
+    :param status_filter: An optional status ('NOT STARTED', 'STARTED', or 'COMPLETED') for filtering.
+    :param limit: An optional maximum number of tasks to list.
+    :param offset: An optional number of matching tasks to skip before listing.
+    :param after_id: An optional task number; only tasks with a higher number are listed (keyset pagination).
+    :param itersize: The number of rows fetched per round trip.
+    :return: An async iterator of Task records.
+    """
+    query, parameters = queries.build_list_query(status_filter, limit, offset, after_id)
+    async_pool = await get_async_pool()
+    async with async_pool.connection() as connection:
+        async with connection.transaction():
+            async with connection.cursor(name="taskdb_list_tasks") as cursor:
+                cursor.itersize = itersize
+                await cursor.execute(query, parameters)
+                async for row in cursor:
+                    yield Task(*row)
+
+
+async def list_tasks(status_filter: str | None = None, limit: int | None = None, offset: int | None = None,
+                     after_id: int | None = None) -> list:
+    """Lists tasks from the database.
+    :param status_filter: An optional status ('NOT STARTED', 'STARTED', or 'COMPLETED') for filtering.
+    :param limit: An optional maximum number of tasks to list.
+    :param offset: An optional number of matching tasks to skip before listing.
+    :param after_id: An optional task number; only tasks with a higher number are listed (keyset pagination).
+    :return: A list of Task records.
+    """
+    query, parameters = queries.build_list_query(status_filter, limit, offset, after_id)
+    async_pool = await get_async_pool()
+    async with async_pool.connection() as connection:
+        cursor = await connection.execute(query, parameters)
+        return [Task(*row) for row in await cursor.fetchall()]
+
+
+async def add_task(description: str) -> Task:
+    """Adds a task, along with the current date and time, to the database.
+    :param description: A string of the task's description.
+    :return: The new task as a Task record.
+    """
+    async_pool = await get_async_pool()
+    async with async_pool.connection() as connection:
+        cursor = await connection.execute(queries.ADD_TASK, (description,))
+        return Task(*await cursor.fetchone())
+
+
+async def _mutate_tasks(query: str, parameters: tuple, task_ids: list) -> MutationResult:
+    """Runs one set-based statement against several tasks and reports which of them it touched.
+    :param query: A statement ending in RETURNING task_id.
+    :param parameters: The statement's parameters.
+    :param task_ids: The task numbers that were requested.
+    :return: A MutationResult listing the found and missing task numbers.
+    """
+    async_pool = await get_async_pool()
+    async with async_pool.connection() as connection:
+        cursor = await connection.execute(query, parameters)
+        return MutationResult.from_rows(task_ids, await cursor.fetchall())
+
+
+async def delete_tasks(task_ids: list) -> MutationResult:
+    """Deletes several tasks from the database in a single transaction.
+    :param task_ids: The ID numbers of the tasks as a list of ints.
+    :return: A MutationResult listing the deleted and missing task numbers.
+    """
+    return await _mutate_tasks(queries.DELETE_TASKS, (list(task_ids),), task_ids)
+
+
+async def delete_task(task_id: int) -> bool:
+    """Deletes a task from the database.
+    :param task_id: The ID number of the task as an int.
+    :return: True if the task was deleted, but False if it doesn't exist.
+    """
+    return bool((await delete_tasks([task_id])).found_task_ids)
+
+
+async def add_tasks_status(task_ids: list, task_status: str) -> MutationResult:
+    """Adds the same status, along with the current date and time, to several tasks in a single transaction.
+    :param task_ids: The ID numbers of the tasks as a list of ints.
+    :param task_status: The tasks' status (NOT STARTED, STARTED, or COMPLETED)
+    :return: A MutationResult listing the updated and missing task numbers.
+    """
+    return await _mutate_tasks(queries.UPDATE_TASKS_STATUS, (task_status.upper(), list(task_ids)), task_ids)
+
+
+async def add_task_status(task_id: int, task_status: str) -> bool:
+    """Adds the status, along with the current date and time, to a task via its ID.
+    :param task_id: The ID number of the task as an int.
+    :param task_status: The task's status (NOT STARTED, STARTED, or COMPLETED)
+    :return: True if the task was updated, but False if it doesn't exist.
+    """
+    return bool((await add_tasks_status([task_id], task_status)).found_task_ids)
+
+
+async def update_tasks_description(task_ids: list, new_description: str) -> MutationResult:
+    """Gives several tasks the same new description in a single transaction.
+    :param task_ids: The ID numbers of the tasks as a list of ints.
+    :param new_description: The tasks' new description as a string.
+    :return: A MutationResult listing the updated and missing task numbers.
+    """
+    return await _mutate_tasks(queries.UPDATE_TASKS_DESCRIPTION, (new_description, list(task_ids)), task_ids)
+
+
+async def update_task_description(task_id: int, new_description: str) -> bool:
+    """Updates the task's description via its ID.
+    :param task_id: The ID number of the task as an int.
+    :param new_description: The task's new description as a string.
+    :return: True if the task was updated, but False if it doesn't exist.
+    """
+    return bool((await update_tasks_description([task_id], new_description)).found_task_ids)
@@ -0,0 +1,365 @@
+#!/usr/bin/python3
+"""This module contains the storage backends that TaskRepository runs on.
+
+A backend supplies connections, the SQL dialect (a queries module), its driver's error classes, and bulk import/export.
+TASKDB_BACKEND picks one: "postgresql" (the default) or "sqlite", an embedded database file that needs no server.
+"""
+import csv
+import json
+import os
+import select
+import threading
+from contextlib import closing, contextmanager
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+from . import instrumentation
+from .records import TaskChange
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Columns that may appear in an imported file. task_id is always generated by the database.
+IMPORT_COLUMNS: tuple = ("task", "task_status", "task_date_and_time", "task_status_date_and_time")
+EXPORT_COLUMNS: tuple = ("task_id",) + IMPORT_COLUMNS
+
+# COPY options that pass one JSON document per line through untouched: neither character appears in JSON text.
+JSONL_COPY_OPTIONS: str = "FORMAT csv, QUOTE e'\\x01', DELIMITER e'\\x02'"
+
+
+class UnsupportedOperationError(Exception):
+    """Raised when a backend can't perform an operation at all, such as watching for changes on SQLite."""
+
+
+def read_csv_header(file) -> list:
+    """Reads and checks the header row of a CSV file being imported.
+    :param file: A text file object positioned at the start of the file.
+    :return: The list of column names.
+    """
+    header: list = next(csv.reader([file.readline()]), [])
+    unknown_columns: list = [column for column in header if column not in EXPORT_COLUMNS]
+    if "task" not in header or unknown_columns:
+        raise ValueError(f"The file needs a header row with a \"task\" column and only these "
+                         f"columns: {', '.join(EXPORT_COLUMNS)}")
+    return header
+
+
+class PostgresBackend:
+    """Stores tasks in PostgreSQL through the shared psycopg2 connection pool."""
+    name: str = "postgresql"
+
+    def __init__(self):
+        """Loads psycopg2 and the pool. No connection is opened until the first operation."""
+        import psycopg2
+        from psycopg2 import errors
+        from . import queries
+        from .pool import borrow_connection
+        self.queries = queries
+        self.Error = psycopg2.Error
+        self.UndefinedTable = errors.UndefinedTable
+        self.UndefinedColumn = errors.UndefinedColumn
+        self.connection = borrow_connection
+        # Identifies the database in cache keys, so listings cached for one database are never served for another.
+        self.identity: str = f"postgresql://{os.getenv('TASKDB_USER')}@{os.getenv('TASKDB_HOST')}:" \
+                             f"{os.getenv('TASKDB_PORT')}/{os.getenv('TASKDB_NAME')}"
+
+    @staticmethod
+    def cursor(connection, name: str | None = None, itersize: int | None = None):
+        """Opens a cursor. Named cursors are server-side, so large results are streamed in itersize batches.
+        :param connection: A database connection.
+        :param name: An optional name that makes the cursor server-side.
+        :param itersize: The number of rows a server-side cursor fetches per round trip.
+        :return: A cursor, usable as a context manager.
+        """
+        cursor = connection.cursor(name=name)
+        if name and itersize:
+            cursor.itersize = itersize
+        if instrumentation.enabled:
+            return instrumentation.InstrumentedCursor(cursor, round_trip_fetches=bool(name))
+        return cursor
+
+    @staticmethod
+    def task_id_list(task_ids: list) -> list:
+        """Adapts task numbers for the "= ANY(%s)" statements.
+        :param task_ids: The task numbers as a list of ints.
+        :return: A list, which psycopg2 sends as an integer array.
+        """
+        return list(task_ids)
+
+    @staticmethod
+    def bump_version(cursor):
+        """Does nothing: the statement-level trigger from migration 004 already bumps tasks_version.
+        :param cursor: A cursor inside the operation's transaction.
+        :return: None
+        """
+
+    def archive_tasks(self, cursor, cutoff: datetime, batch_size: int) -> int:
+        """Moves one batch of completed tasks into tasks_archive with a single DELETE ... RETURNING statement.
+        :param cursor: A cursor inside the batch's transaction.
+        :param cutoff: Tasks completed before this time are archived.
+        :param batch_size: The most tasks to move.
+        :return: The number of tasks archived.
+        """
+        cursor.execute(self.queries.ARCHIVE_TASKS, (cutoff, batch_size))
+        return cursor.rowcount
+
+    def iter_changes(self, timeout: float | None = None):
+        """Streams the changes announced by the migration 006 triggers. It LISTENs on a dedicated connection of its
+        own, outside the pool, and waits in select() between notifications, so nothing is polled.
+        :param timeout: Stop after this many seconds without a change (Default: wait forever).
+        :return: An iterator of TaskChange records.
+        """
+        import psycopg2
+        connection = psycopg2.connect(
+            dbname=os.getenv("TASKDB_NAME"),
+            user=os.getenv("TASKDB_USER"),
+            password=os.getenv("TASKDB_PASSWORD"),
+            host=os.getenv("TASKDB_HOST"),
+            port=os.getenv("TASKDB_PORT")
+        )
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.queries.TASK_CHANGES_CHANNEL};")
+            while True:
+                if select.select([connection], [], [], timeout) == ([], [], []):
+                    return
+                connection.poll()
+                while connection.notifies:
+                    change: dict = json.loads(connection.notifies.pop(0).payload)
+                    yield TaskChange(change["operation"], change["task_id"], change["task_status"], change["count"])
+        finally:
+            connection.close()
+
+    @staticmethod
+    def import_tasks(cursor, file, file_format: str) -> int:
+        """Streams tasks from a CSV or JSONL file with COPY ... FROM STDIN into a staging table, then inserts them in
+        one statement that fills in the add_task defaults.
+        :param cursor: A cursor inside the import's transaction.
+        :param file: A text file object positioned at the start of the file.
+        :param file_format: The file's format ('csv' or 'jsonl').
+        :return: The number of tasks imported.
+        """
+        if file_format == "csv":
+            header: list = read_csv_header(file)
+            cursor.execute("CREATE TEMP TABLE tasks_import (task_id text, task text, task_status text, "
+                           "task_date_and_time timestamptz, task_status_date_and_time timestamptz) "
+                           "ON COMMIT DROP;")
+            cursor.copy_expert(f"COPY tasks_import ({', '.join(header)}) FROM STDIN WITH (FORMAT csv);", file)
+            select_query: str = "SELECT task, task_status, task_date_and_time, " \
+                                "task_status_date_and_time FROM tasks_import"
+        else:
+            # Lines are staged as text, so blank ones (which COPY loads as NULL) can be skipped like the SQLite backend
+            # skips them, instead of failing the whole import.
+            cursor.execute("CREATE TEMP TABLE tasks_import (document text) ON COMMIT DROP;")
+            cursor.copy_expert(f"COPY tasks_import (document) FROM STDIN WITH ({JSONL_COPY_OPTIONS});", file)
+            select_query = "SELECT document->>'task', document->>'task_status', " \
+                           "(document->>'task_date_and_time')::timestamptz, " \
+                           "(document->>'task_status_date_and_time')::timestamptz " \
+                           "FROM (SELECT document::jsonb AS document FROM tasks_import " \
+                           "WHERE btrim(document, e' \\t\\r') <> '') AS documents"
+        cursor.execute(
+            "INSERT INTO tasks (task, task_status, task_date_and_time, task_status_date_and_time) "
+            "SELECT task, COALESCE(upper(task_status), 'NOT STARTED'), COALESCE(task_date_and_time, now()), "
+            f"task_status_date_and_time FROM ({select_query}) AS imported (task, task_status, "
+            "task_date_and_time, task_status_date_and_time);")
+        return cursor.rowcount
+
+    @staticmethod
+    def export_tasks(cursor, file, file_format: str) -> int:
+        """Streams every task into a file as CSV or JSONL with COPY ... TO STDOUT.
+        :param cursor: A cursor inside the export's transaction.
+        :param file: A writable text file object.
+        :param file_format: The file's format ('csv' or 'jsonl').
+        :return: The number of tasks exported.
+        """
+        select_query: str = f"SELECT {', '.join(EXPORT_COLUMNS)} FROM tasks ORDER BY task_id"
+        if file_format == "csv":
+            copy_query: str = f"COPY ({select_query}) TO STDOUT WITH (FORMAT csv, HEADER);"
+        else:
+            copy_query = f"COPY (SELECT row_to_json(exported) FROM ({select_query}) AS exported) " \
+                         f"TO STDOUT WITH ({JSONL_COPY_OPTIONS});"
+        cursor.copy_expert(copy_query, file)
+        return cursor.rowcount
+
+
+def parse_timestamp(value) -> datetime | None:
+    """Parses a timestamp stored by, or imported into, the SQLite backend.
+    :param value: ISO-8601 text or bytes, PostgreSQL's "+00" offset style included, or None.
+    :return: A timezone-aware datetime (UTC if the text has no offset), or None.
+    """
+    if value is None or value == "":
+        return None
+    text: str = value.decode() if isinstance(value, bytes) else str(value)
+    if len(text) > 3 and text[-3] in "+-" and text[-3:].lstrip("+-").isdigit():
+        text += ":00"
+    parsed: datetime = datetime.fromisoformat(text)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def format_timestamp(value) -> str | None:
+    """Normalizes an imported timestamp to the text the SQLite backend stores.
+    :param value: A timestamp string from an imported file, or None.
+    :return: UTC ISO-8601 text, or None.
+    """
+    parsed: datetime | None = parse_timestamp(value)
+    return parsed.astimezone(timezone.utc).isoformat(sep=" ", timespec="milliseconds") if parsed else None
+
+
+class SQLiteBackend:
+    """Stores tasks in an embedded SQLite database file in WAL mode. Each thread keeps one open connection, so
+    sqlite3's statement cache reuses prepared statements across operations."""
+    name: str = "sqlite"
+
+    def __init__(self, database_path: str):
+        """Remembers the database file. It is created, along with the schema, on first use.
+        :param database_path: The pathname of the SQLite database file, or ":memory:".
+        """
+        # sqlite3 is only loaded when the SQLite backend is chosen, so PostgreSQL users don't pay for it at startup.
+        import sqlite3
+        from . import sqlite_queries
+        sqlite3.register_converter("timestamptz", parse_timestamp)
+        self.sqlite3 = sqlite3
+        self.database_path = database_path
+        self.queries = sqlite_queries
+        self.Error = sqlite3.Error
+        self.UndefinedTable = sqlite3.OperationalError
+        self.UndefinedColumn = sqlite3.OperationalError
+        self.identity: str = "sqlite::memory:" if database_path == ":memory:" \
+            else f"sqlite:{os.path.realpath(database_path)}"
+        self._local = threading.local()
+
+    def _connect(self):
+        """Opens this thread's connection, switches it to WAL mode, and applies the schema.
+        :return: A sqlite3 connection.
+        """
+        if self.database_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.database_path)), exist_ok=True)
+        connection = self.sqlite3.connect(self.database_path, detect_types=self.sqlite3.PARSE_DECLTYPES,
+                                          cached_statements=256)
+        connection.execute("PRAGMA journal_mode = WAL;")
+        connection.execute("PRAGMA synchronous = NORMAL;")
+        connection.execute("PRAGMA busy_timeout = 5000;")
+        connection.executescript(self.queries.SCHEMA)
+        return connection
+
+    @contextmanager
+    def connection(self):
+        """Yields this thread's SQLite connection, opening it on first use.
+        :return: A context manager yielding a sqlite3 connection.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            with instrumentation.span("connect"):
+                connection = self._local.connection = self._connect()
+        yield connection
+
+    @staticmethod
+    def cursor(connection, name: str | None = None, itersize: int | None = None):
+        """Opens a cursor. SQLite cursors already step through results lazily, so the name is ignored.
+        :param connection: A sqlite3 connection.
+        :param name: Ignored; accepted for compatibility with PostgresBackend.
+        :param itersize: The number of rows fetched per fetchmany call.
+        :return: A cursor, usable as a context manager.
+        """
+        cursor = connection.cursor()
+        if itersize:
+            cursor.arraysize = itersize
+        if instrumentation.enabled:
+            return instrumentation.InstrumentedCursor(cursor, round_trip_fetches=False)
+        return closing(cursor)
+
+    @staticmethod
+    def task_id_list(task_ids: list) -> str:
+        """Adapts task numbers for the json_each() statements.
+        :param task_ids: The task numbers as a list of ints.
+        :return: The task numbers as a JSON array.
+        """
+        return json.dumps(list(task_ids))
+
+    def bump_version(self, cursor):
+        """Bumps tasks_version once for the whole operation, the way PostgreSQL's statement-level trigger does.
+        :param cursor: A cursor inside the operation's transaction.
+        :return: None
+        """
+        cursor.execute(self.queries.BUMP_TASKS_VERSION)
+
+    def archive_tasks(self, cursor, cutoff: datetime, batch_size: int) -> int:
+        """Moves one batch of completed tasks into tasks_archive, copying them and then deleting them.
+        :param cursor: A cursor inside the batch's transaction.
+        :param cutoff: Tasks completed before this time are archived.
+        :param batch_size: The most tasks to move.
+        :return: The number of tasks archived.
+        """
+        parameters: tuple = (format_timestamp(cutoff), batch_size)
+        cursor.execute(self.queries.ARCHIVE_TASKS, parameters)
+        cursor.execute(self.queries.DELETE_ARCHIVED_TASKS, parameters)
+        return cursor.rowcount
+
+    def iter_changes(self, timeout: float | None = None):
+        """SQLite has no LISTEN/NOTIFY, so there is no change feed to stream.
+        :param timeout: Ignored.
+        :return: Never returns.
+        """
+        raise UnsupportedOperationError("Watching for changes needs PostgreSQL's LISTEN/NOTIFY. The SQLite backend "
+                                        "doesn't support it.")
+
+    def import_tasks(self, cursor, file, file_format: str) -> int:
+        """Streams tasks from a CSV or JSONL file into the database with executemany, filling in the add_task
+        defaults. Rows are read lazily, so memory use stays flat.
+        :param cursor: A cursor inside the import's transaction.
+        :param file: A text file object positioned at the start of the file.
+        :param file_format: The file's format ('csv' or 'jsonl').
+        :return: The number of tasks imported.
+        """
+        if file_format == "csv":
+            records = csv.DictReader(file, fieldnames=read_csv_header(file))
+        else:
+            records = (json.loads(line) for line in file if line.strip())
+        cursor.executemany(self.queries.IMPORT_TASK, (
+            (record.get("task"), (record.get("task_status") or "NOT STARTED").upper(),
+             format_timestamp(record.get("task_date_and_time")),
+             format_timestamp(record.get("task_status_date_and_time")))
+            for record in records))
+        return cursor.rowcount
+
+    def export_tasks(self, cursor, file, file_format: str) -> int:
+        """Streams every task into a file as CSV or JSONL.
+        :param cursor: A cursor inside the export's transaction.
+        :param file: A writable text file object.
+        :param file_format: The file's format ('csv' or 'jsonl').
+        :return: The number of tasks exported.
+        """
+        cursor.execute(self.queries.EXPORT_TASKS)
+        exported_count: int = 0
+        writer = csv.writer(file) if file_format == "csv" else None
+        if writer:
+            writer.writerow(EXPORT_COLUMNS)
+        for row in cursor:
+            values: list = [value.isoformat() if isinstance(value, datetime) else value for value in row]
+            if writer:
+                writer.writerow(values)
+            else:
+                file.write(json.dumps(dict(zip(EXPORT_COLUMNS, values))) + "\n")
+            exported_count += 1
+        return exported_count
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Returns the process-wide backend chosen by TASKDB_BACKEND, creating it on first use.
+    :return: A PostgresBackend or SQLiteBackend.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            backend_name: str = os.getenv("TASKDB_BACKEND", "postgresql").lower()
+            if backend_name in ("postgresql", "postgres"):
+                _backend = PostgresBackend()
+            elif backend_name == "sqlite":
+                _backend = SQLiteBackend(os.path.expanduser(os.getenv("TASKDB_SQLITE_PATH", "~/.taskdb.sqlite3")))
+            else:
+                raise ValueError(f"Unknown TASKDB_BACKEND \"{backend_name}\". Use \"postgresql\" or \"sqlite\".")
+        return _backend
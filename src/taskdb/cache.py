@@ -0,0 +1,271 @@
+#!/usr/bin/python3
+"""This module contains the read-through cache for task listings.
+
+Each cached listing is stored with the value of the tasks_version counter (migration 004) it was read at, together
+with the database's random generation id (migration 008), and is keyed by the database's identity. A listing is only
+served from the cache while both are unchanged, so cached reads never return stale data, even from a different or
+recreated database that has reached the same count. The cache lives in memory for library use and can also be kept
+in a directory, one file per listing, which lets separate CLI runs share it. A run only reads the files of the
+listings it looks up, and only writes the ones it changed.
+"""
+import atexit
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from .records import Task
+
+# The file in the cache directory that holds the hit and miss counters.
+STATS_FILE_NAME: str = "stats.json"
+
+
+class TaskCache:
+    """A least-recently-used cache of task listings keyed by their filters."""
+
+    def __init__(self, max_entries: int = 64, max_rows: int = 10000, cache_directory: str | None = None):
+        """Creates an empty cache.
+        :param max_entries: The number of listings kept, in memory and in the cache directory, before the least
+                            recently used one is evicted.
+        :param max_rows: Listings with more rows than this are never cached, so memory stays bounded.
+        :param cache_directory: An optional directory that listings are read from on first lookup and saved to.
+        """
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.cache_directory = cache_directory
+        # This process's lookups. The directory's stats file holds the totals of earlier runs.
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._read_keys: set = set()
+        self._changed_keys: set = set()
+        self._lock = threading.Lock()
+        if cache_directory:
+            atexit.register(self.save)
+
+    @classmethod
+    def from_environment(cls):
+        """Creates the CLI's cache when TASKDB_CACHE_PATH names a cache directory.
+        :return: A TaskCache, or None if caching is not configured.
+        """
+        cache_directory: str | None = os.getenv("TASKDB_CACHE_PATH")
+        if not cache_directory:
+            return None
+        return cls(max_entries=int(os.getenv("TASKDB_CACHE_MAX_ENTRIES", "64")),
+                   max_rows=int(os.getenv("TASKDB_CACHE_MAX_ROWS", "10000")),
+                   cache_directory=os.path.expanduser(cache_directory))
+
+    @staticmethod
+    def make_key(*filters) -> str:
+        """Builds a cache key from a listing's filters.
+        :param filters: The database's identity, then the filter values, such as the status filter, limit, offset, and
+                        after_id.
+        :return: A string key.
+        """
+        return json.dumps(filters)
+
+    def get(self, key: str, version: str | None) -> list | None:
+        """Looks up a listing that was read at the given version, reading its file the first time the key is seen.
+        :param key: A key from make_key.
+        :param version: The current generation and tasks_version, or None if they aren't available.
+        :return: The cached list of Task records, or None on a miss.
+        """
+        with self._lock:
+            if version is not None and key not in self._entries and key not in self._read_keys:
+                self._read_keys.add(key)
+                self._read_entry(key, version)
+            entry = self._entries.get(key)
+            if version is None or entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, version: str | None, tasks: list):
+        """Stores a listing read at the given version.
+        :param key: A key from make_key.
+        :param version: The generation and tasks_version read before the listing, or None to skip caching.
+        :param tasks: The list of Task records.
+        :return: None
+        """
+        if version is None or len(tasks) > self.max_rows:
+            return
+        with self._lock:
+            self._store(key, version, tasks)
+            self._changed_keys.add(key)
+
+    def invalidate(self):
+        """Drops every cached listing from memory. Called after this process changes any task. Their files can stay:
+        they were read at an older version, so they are never served again.
+        :return: None
+        """
+        with self._lock:
+            self._entries.clear()
+            self._read_keys.clear()
+            self._changed_keys.clear()
+
+    def clear(self):
+        """Drops every cached listing, in memory and in the cache directory, and resets the hit and miss counters.
+        :return: None
+        """
+        self.invalidate()
+        with self._lock:
+            self.hits = self.misses = 0
+            if not self.cache_directory:
+                return
+            try:
+                file_names: list = os.listdir(self.cache_directory)
+            except OSError:
+                return
+            for file_name in file_names:
+                if file_name.endswith(".json"):
+                    try:
+                        os.remove(os.path.join(self.cache_directory, file_name))
+                    except OSError:
+                        pass
+
+    def stats(self) -> dict:
+        """Reports the cache's hit and miss counters, including earlier runs that shared the cache directory.
+        :return: A dict with the hits, misses, hit ratio, and number of cached listings.
+        """
+        stored: dict = self._read_counters()
+        hits: int = stored["hits"] + self.hits
+        misses: int = stored["misses"] + self.misses
+        lookups: int = hits + misses
+        return {"hits": hits, "misses": misses, "hit_ratio": hits / lookups if lookups else 0.0,
+                "entries": self._count_entries()}
+
+    def save(self):
+        """Writes the listings this process added to the cache directory, one file per listing, and adds this
+        process's lookups to the stored counters. Every file is replaced atomically. Runs automatically at exit when
+        the cache has a directory.
+        :return: None
+        """
+        if not self.cache_directory:
+            return
+        with self._lock:
+            changed: list = [(key, self._entries[key]) for key in self._changed_keys if key in self._entries]
+            self._changed_keys.clear()
+            hits, misses = self.hits, self.misses
+            self.hits = self.misses = 0
+        if not changed and not hits and not misses:
+            return
+        try:
+            if os.path.isfile(self.cache_directory):
+                # Earlier versions kept every listing in one snapshot file at this path.
+                os.remove(self.cache_directory)
+            os.makedirs(self.cache_directory, exist_ok=True)
+            for key, (version, tasks) in changed:
+                rows: list = [[task.task_id, task.task, task.task_status,
+                               task.task_date_and_time.isoformat() if task.task_date_and_time else None,
+                               task.task_status_date_and_time.isoformat() if task.task_status_date_and_time else None]
+                              for task in tasks]
+                self._write_atomically(self._entry_path(key), [key, version], rows)
+            if hits or misses:
+                stored: dict = self._read_counters()
+                self._write_atomically(os.path.join(self.cache_directory, STATS_FILE_NAME),
+                                       {"hits": stored["hits"] + hits, "misses": stored["misses"] + misses})
+            if changed:
+                self._evict_files()
+        except OSError:
+            pass
+
+    def _store(self, key: str, version: str, tasks: list):
+        """Adds a listing to memory, evicting the least recently used ones beyond max_entries. Needs the lock held.
+        :param key: A key from make_key.
+        :param version: The generation and tasks_version the listing was read at.
+        :param tasks: The list of Task records.
+        :return: None
+        """
+        self._entries[key] = (version, tasks)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _entry_path(self, key: str) -> str:
+        """Names the file a listing is kept in.
+        :param key: A key from make_key.
+        :return: A pathname in the cache directory.
+        """
+        return os.path.join(self.cache_directory, f"{hashlib.sha1(key.encode()).hexdigest()}.json")
+
+    def _read_entry(self, key: str, version: str):
+        """Loads one listing's file into memory if it was read at the given version, ignoring anything missing,
+        unreadable, or stale. The rows are only parsed when the version matches. Needs the lock held.
+        :param key: A key from make_key.
+        :param version: The current generation and tasks_version.
+        :return: None
+        """
+        if not self.cache_directory:
+            return
+        try:
+            with open(self._entry_path(key), "r", encoding="utf-8") as file:
+                if json.loads(file.readline()) != [key, version]:
+                    return
+                rows: list = json.loads(file.readline())
+        except (OSError, ValueError):
+            return
+        self._store(key, version, [Task(task_id, task, task_status,
+                                        datetime.fromisoformat(added) if added else None,
+                                        datetime.fromisoformat(modified) if modified else None)
+                                   for task_id, task, task_status, added, modified in rows])
+
+    def _read_counters(self) -> dict:
+        """Reads the hit and miss counters of earlier runs.
+        :return: A dict with the stored hits and misses, which are 0 if there is no stats file.
+        """
+        counters: dict = {"hits": 0, "misses": 0}
+        if not self.cache_directory:
+            return counters
+        try:
+            with open(os.path.join(self.cache_directory, STATS_FILE_NAME), "r", encoding="utf-8") as file:
+                stored: dict = json.loads(file.readline())
+            counters.update((name, stored.get(name, 0)) for name in counters)
+        except (OSError, ValueError):
+            pass
+        return counters
+
+    def _listing_files(self) -> list:
+        """Lists the listing files in the cache directory.
+        :return: A list of pathnames, or an empty list if the directory can't be read.
+        """
+        try:
+            file_names: list = os.listdir(self.cache_directory)
+        except OSError:
+            return []
+        return [os.path.join(self.cache_directory, file_name) for file_name in file_names
+                if file_name.endswith(".json") and file_name != STATS_FILE_NAME]
+
+    def _count_entries(self) -> int:
+        """Counts the cached listings.
+        :return: The number of listing files, or of listings in memory when the cache has no directory.
+        """
+        if not self.cache_directory:
+            return len(self._entries)
+        return len(self._listing_files())
+
+    def _evict_files(self):
+        """Removes the least recently written listing files beyond max_entries.
+        :return: None
+        """
+        listing_files: list = self._listing_files()
+        if len(listing_files) <= self.max_entries:
+            return
+        listing_files.sort(key=lambda path: os.stat(path).st_mtime)
+        for path in listing_files[:len(listing_files) - self.max_entries]:
+            os.remove(path)
+
+    @staticmethod
+    def _write_atomically(path: str, *lines):
+        """Writes JSON values, one per line, to a temporary file and renames it over the destination.
+        :param path: The destination pathname.
+        :param lines: The JSON-serializable values.
+        :return: None
+        """
+        temporary_path: str = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            for line in lines:
+                file.write(json.dumps(line) + "\n")
+        os.replace(temporary_path, path)
@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+"""This module contains the client side of `taskdb serve`.
+
+When a daemon is listening on the socket, the CLI sends it the command line and prints what it sends back, so the
+command runs on the daemon's warm connection instead of paying for startup and a new connection. The client also sends
+its database settings, and the daemon declines commands from a client whose settings differ from its own, so they run
+locally against the client's database instead. This module is imported on every forwarded command, so it only uses the
+standard library and never loads python-dotenv or psycopg2.
+"""
+import json
+import os
+import socket
+import sys
+
+# Environment variables that choose the database and how taskdb uses it. A daemon only runs commands for clients whose
+# values match its own.
+SETTINGS_PREFIXES: tuple = ("TASKDB_", "DEFAULT_DB_", "PG")
+
+# Settings that only concern the client, so they may differ from the daemon's.
+CLIENT_SETTINGS: tuple = ("TASKDB_NO_DAEMON", "TASKDB_SOCKET_PATH")
+
+# Commands that always run in the calling process. watch runs until interrupted, so it would tie up the daemon.
+LOCAL_COMMANDS: tuple = ("serve", "shell", "watch", "-h", "--help")
+
+
+def default_socket_path() -> str:
+    """Returns the daemon's socket path: TASKDB_SOCKET_PATH, or a per-user file in the home directory.
+    :return: A pathname.
+    """
+    return os.path.expanduser(os.environ.get("TASKDB_SOCKET_PATH") or "~/.taskdb.sock")
+
+
+def settings_environment(environment=None) -> dict:
+    """Picks the environment variables a daemon and its clients must agree on.
+    :param environment: A mapping of environment variables (Default: os.environ).
+    :return: A dict of the TASKDB_*, DEFAULT_DB_*, and libpq PG* variables, without the client-only ones.
+    """
+    environment = os.environ if environment is None else environment
+    return {name: value for name, value in environment.items()
+            if name.startswith(SETTINGS_PREFIXES) and name not in CLIENT_SETTINGS}
+
+
+def should_forward(argv: list) -> bool:
+    """Decides whether a command line can be forwarded to a daemon.
+    :param argv: The command-line arguments.
+    :return: False for the daemon and shell themselves, help, reading task numbers from standard input, and when
+             TASKDB_NO_DAEMON is set. Otherwise True.
+    """
+    if os.environ.get("TASKDB_NO_DAEMON") or not argv:
+        return False
+    return not any(argument in LOCAL_COMMANDS or argument == "-" or argument.endswith("=-") for argument in argv)
+
+
+def forward(argv: list, socket_path: str | None = None) -> int | None:
+    """Runs a command on a running daemon, copying its output to this process's standard output and error.
+    :param argv: The command-line arguments.
+    :param socket_path: The daemon's socket (Default: default_socket_path()).
+    :return: The command's exit code, or None if no daemon answered, or the daemon uses different database settings,
+             and the command should run locally.
+    """
+    socket_path = socket_path or default_socket_path()
+    if not os.path.exists(socket_path):
+        return None
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(socket_path)
+    except OSError:
+        connection.close()
+        return None
+
+    with connection, connection.makefile("rwb") as stream:
+        request: dict = {"argv": argv, "cwd": os.getcwd(), "settings": settings_environment()}
+        stream.write(json.dumps(request).encode() + b"\n")
+        stream.flush()
+        for line in stream:
+            message: dict = json.loads(line)
+            if "run_locally" in message:
+                return None
+            if "exit_code" in message:
+                return message["exit_code"]
+            output = sys.stdout if message["stream"] == "stdout" else sys.stderr
+            output.write(message["data"])
+            output.flush()
+    print("Error: The taskdb daemon closed the connection before the command finished.", file=sys.stderr)
+    return 1
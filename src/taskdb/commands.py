@@ -1,48 +1,192 @@
 #!/usr/bin/python3
 """This module contains the CLI commands."""
 import argparse
+import re
+import sys
+from datetime import timedelta
 
-parser = argparse.ArgumentParser(
-    prog="TaskDB",
-    usage="\n%(prog)s [ADD | DELETE] [TASK]\n%(prog)s [OPTION] [TASK NUM]",
-    description="A CLI To-do list tracking task status in a database.",
-)
+# The same formats as render.OUTPUT_FORMATS, listed here so --help and usage errors never import the renderers.
+OUTPUT_FORMATS: list = ["text", "tsv", "json", "table"]
 
-# Subparsers
-subparsers: parser = parser.add_subparsers(title="Commands", dest="command_name", help="Available commands")
+# The most task numbers one --task-num value may name, so a typo like 1-100000000 fails fast instead of building a huge
+# list and sending it to the database.
+MAX_TASK_IDS: int = 100_000
 
-add_parser: parser = subparsers.add_parser("add", help="Add a task")
-add_parser.add_argument("task_description", metavar='"Task Description"',
-                        help="Description about the task to add in quotation marks")
+# The units --older-than accepts, in days. Months and years are approximate, like PostgreSQL's interval justification.
+INTERVAL_UNITS: dict = {"d": 1, "day": 1, "days": 1, "w": 7, "week": 7, "weeks": 7, "m": 30, "month": 30,
+                        "months": 30, "y": 365, "year": 365, "years": 365}
 
-delete_parser: parser = subparsers.add_parser("delete", help="Delete a task")
-delete_parser.add_argument("--task-num=", dest="task_id", metavar='Task Number', type=int,
-                           help="The task number to delete (Example Usage: --task-num=1)")
 
-task_status_parser: parser = subparsers.add_parser("status", help="Add a status to a task")
-task_status_parser.add_argument("--task-num=", dest="task_id", metavar='Task Number', type=int,
-                                help="The task number to update the status (Example Usage: --task-num=1)")
-task_status_parser.add_argument("status_value",
-                                choices=["not-started", "started", "completed"],
-                                help="The new status of a task (NOT STARTED, STARTED, COMPLETED)")
+def parse_task_ids(value: str) -> list:
+    """Parses a --task-num value into task numbers. Accepts single numbers, comma-separated lists, and ranges
+    (Example: 1,5,10-200). A value of "-" reads the numbers from standard input instead, separated by commas or whitespace.
+    :param value: The raw --task-num value.
+    :return: A list of unique task numbers in the order given.
+    """
+    if value == "-":
+        value = sys.stdin.read()
+    task_ids: dict = {}
+    for part in re.split(r"[,\s]+", value.strip()):
+        if not part:
+            continue
+        match = re.fullmatch(r"(\d+)(?:-(\d+))?", part)
+        if match is None:
+            raise argparse.ArgumentTypeError(f"Task numbers must be numbers or ranges like 10-20. You provided: '{part}'")
+        first, last = int(match.group(1)), int(match.group(2) or match.group(1))
+        if last < first:
+            raise argparse.ArgumentTypeError(f"The range '{part}' ends before it starts.")
+        if last - first + 1 > MAX_TASK_IDS:
+            raise argparse.ArgumentTypeError(f"The range '{part}' names more than {MAX_TASK_IDS:,} tasks.")
+        task_ids.update(dict.fromkeys(range(first, last + 1)))
+        if len(task_ids) > MAX_TASK_IDS:
+            raise argparse.ArgumentTypeError(f"Task numbers are limited to {MAX_TASK_IDS:,} per command.")
+    return list(task_ids)
 
-update_task_parser: parser = subparsers.add_parser("update", help="Update a task's description")
-update_task_parser.add_argument("--task-num=", dest="task_id", metavar='Task Number', type=int,
-                                help="The task number to update (Example Usage: --task-num=1)")
-update_task_parser.add_argument("task_description", metavar='"Task Description"',
-                                help="Description about the task to update in quotation marks")
 
-# Options
-parser.add_argument("--lall", "--listall", dest="command_name", action="store_const", const="lall",
-                    help="List all the tasks in the database")
+def parse_interval(value: str) -> timedelta:
+    """Parses an --older-than value such as "90 days", "2weeks", or "6m".
+    :param value: The raw --older-than value.
+    :return: The interval as a timedelta.
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*([a-z]+)\s*", value.lower())
+    if match is None or match.group(2) not in INTERVAL_UNITS:
+        raise argparse.ArgumentTypeError(f"Intervals must be a number of days, weeks, months, or years (Example: "
+                                         f"90d or '6 months'). You provided: '{value}'")
+    return timedelta(days=int(match.group(1)) * INTERVAL_UNITS[match.group(2)])
 
-parser.add_argument("--s", "--started", dest="command_name", action="store_const", const="s",
-                    help="List all tasks with a STARTED status")
 
-parser.add_argument("--c", "--completed", dest="command_name", action="store_const", const="c",
-                    help="List all tasks with a COMPLETED status")
+def build_parser() -> argparse.ArgumentParser:
+    """Builds the argument parser for every command and option.
+    :return: The TaskDB argument parser.
+    """
+    parser = argparse.ArgumentParser(
+        prog="TaskDB",
+        usage="\n%(prog)s [ADD | DELETE] [TASK]\n%(prog)s [OPTION] [TASK NUM]",
+        description="A CLI To-do list tracking task status in a database.",
+    )
 
-parser.add_argument("--n", "--not-started", dest="command_name", action="store_const", const="n",
-                    help="Lists all tasks with a NOT STARTED status")
+    # --format can also follow the commands that print tasks. Its default is suppressed there, so a --format given
+    # before the command isn't reset by the subcommand.
+    format_parent = argparse.ArgumentParser(add_help=False)
+    format_parent.add_argument("--format", dest="output_format", choices=OUTPUT_FORMATS, default=argparse.SUPPRESS,
+                               help="How to print tasks (Default: text)")
 
-args: parser = parser.parse_args()
+    # Subparsers
+    subparsers: parser = parser.add_subparsers(title="Commands", dest="command_name", help="Available commands")
+
+    add_parser: parser = subparsers.add_parser("add", help="Add a task")
+    add_parser.add_argument("task_description", metavar='"Task Description"',
+                            help="Description about the task to add in quotation marks")
+
+    delete_parser: parser = subparsers.add_parser("delete", help="Delete a task")
+    delete_parser.add_argument("--task-num=", dest="task_id", metavar='Task Numbers', type=parse_task_ids,
+                               help="The task numbers to delete, or - to read them from standard input "
+                                    "(Example Usage: --task-num=1,5,10-20)")
+
+    task_status_parser: parser = subparsers.add_parser("status", help="Add a status to a task")
+    task_status_parser.add_argument("--task-num=", dest="task_id", metavar='Task Numbers', type=parse_task_ids,
+                                    help="The task numbers to update the status, or - to read them from standard input "
+                                         "(Example Usage: --task-num=1,5,10-20)")
+    task_status_parser.add_argument("status_value",
+                                    choices=["not-started", "started", "completed"],
+                                    help="The new status of a task (NOT STARTED, STARTED, COMPLETED)")
+
+    update_task_parser: parser = subparsers.add_parser("update", help="Update a task's description")
+    update_task_parser.add_argument("--task-num=", dest="task_id", metavar='Task Numbers', type=parse_task_ids,
+                                    help="The task numbers to update, or - to read them from standard input "
+                                         "(Example Usage: --task-num=1,5,10-20)")
+    update_task_parser.add_argument("task_description", metavar='"Task Description"',
+                                    help="Description about the task to update in quotation marks")
+
+    search_parser: parser = subparsers.add_parser("search", help="Search task descriptions", parents=[format_parent])
+    search_parser.add_argument("search_terms", metavar='"Search Terms"',
+                               help="Words to look for in quotation marks. \"Quoted phrases\" and -excluded words "
+                                    "work too")
+    search_parser.add_argument("--status", dest="search_status", choices=["not-started", "started", "completed"],
+                               help="Only search tasks with this status")
+    search_parser.add_argument("--fuzzy", dest="fuzzy", action="store_true",
+                               help="Also match descriptions that only resemble the terms, such as misspellings")
+    search_parser.add_argument("--limit", dest="search_limit", metavar="Count", type=int, default=20,
+                               help="Show at most this many matches (Default: 20)")
+
+    stats_parser: parser = subparsers.add_parser("stats", help="Show task counts by status, age, and completion week")
+    stats_parser.add_argument("--weeks", dest="weeks", metavar="Count", type=int, default=8,
+                              help="How many weeks of completions to show (Default: 8)")
+
+    watch_parser: parser = subparsers.add_parser("watch", help="Print task changes as they happen (PostgreSQL only)")
+    watch_parser.add_argument("--format", dest="output_format", choices=["text", "json"], default=argparse.SUPPRESS,
+                              help="How to print changes (Default: text)")
+    watch_parser.add_argument("--status", dest="watch_status", choices=["not-started", "started", "completed"],
+                              help="Only show changes to tasks with this status")
+
+    archive_parser: parser = subparsers.add_parser("archive", help="Move old completed tasks into the archive")
+    archive_parser.add_argument("--older-than", dest="older_than", metavar="Interval", type=parse_interval,
+                                required=True,
+                                help="Archive tasks completed at least this long ago (Example Usage: --older-than=90d)")
+    archive_parser.add_argument("--batch-size", dest="batch_size", metavar="Count", type=int,
+                                help="Tasks moved per transaction (Default: 5000)")
+
+    import_parser: parser = subparsers.add_parser("import", help="Import tasks from a CSV or JSONL file")
+    import_parser.add_argument("file_path", metavar="File",
+                               help="The CSV (with a header row) or JSONL file to import tasks from")
+    import_parser.add_argument("--format", dest="file_format", choices=["csv", "jsonl"],
+                               help="The file's format (Default: inferred from the file extension)")
+
+    export_parser: parser = subparsers.add_parser("export", help="Export all tasks to a CSV or JSONL file")
+    export_parser.add_argument("file_path", metavar="File", help="The CSV or JSONL file to write tasks to")
+    export_parser.add_argument("--format", dest="file_format", choices=["csv", "jsonl"],
+                               help="The file's format (Default: inferred from the file extension)")
+
+    cache_parser: parser = subparsers.add_parser("cache", help="Show or clear the listing cache")
+    cache_parser.add_argument("cache_action", choices=["stats", "clear"],
+                              help="Show the cache's hit/miss counters, or empty the cache")
+
+    subparsers.add_parser("migrate", help="Apply pending database migrations")
+
+    subparsers.add_parser("shell", help="Run many commands in one interactive session")
+
+    serve_parser: parser = subparsers.add_parser("serve", help="Run a daemon that other taskdb commands forward to")
+    serve_parser.add_argument("--socket", dest="socket_path", metavar="Path",
+                              help="The Unix socket to listen on (Default: TASKDB_SOCKET_PATH or ~/.taskdb.sock)")
+
+    # Options
+    parser.add_argument("--lall", "--listall", dest="command_name", action="store_const", const="lall",
+                        help="List all the tasks in the database")
+
+    parser.add_argument("--s", "--started", dest="command_name", action="store_const", const="s",
+                        help="List all tasks with a STARTED status")
+
+    parser.add_argument("--c", "--completed", dest="command_name", action="store_const", const="c",
+                        help="List all tasks with a COMPLETED status")
+
+    parser.add_argument("--n", "--not-started", dest="command_name", action="store_const", const="n",
+                        help="Lists all tasks with a NOT STARTED status")
+
+    # Listing options (used with --lall, --s, --c, and --n)
+    parser.add_argument("--limit", dest="limit", metavar="Count", type=int,
+                        help="List at most this many tasks (Example Usage: --limit=50)")
+
+    parser.add_argument("--offset", dest="offset", metavar="Count", type=int,
+                        help="Skip this many matching tasks before listing (Example Usage: --offset=100)")
+
+    parser.add_argument("--after-id", dest="after_id", metavar="Task Number", type=int,
+                        help="Only list tasks numbered after this one, for fast paging (Example Usage: --after-id=500)")
+
+    parser.add_argument("--itersize", dest="itersize", metavar="Rows", type=int,
+                        help="Rows fetched from the database per round trip while listing (Default: 2000)")
+
+    parser.add_argument("--include-archive", dest="include_archive", action="store_true",
+                        help="Also list the tasks moved to the archive by `taskdb archive`")
+
+    parser.add_argument("--format", dest="output_format", choices=OUTPUT_FORMATS, default="text",
+                        help="How to print listed and searched tasks: text lines, tab-separated values, JSON Lines, "
+                             "or an aligned table (Default: text)")
+
+    # Profiling options
+    parser.add_argument("--profile", dest="profile", action="store_true",
+                        help="Print where the command spent its time, plus its query and round-trip counts")
+
+    parser.add_argument("--cprofile", dest="cprofile_path", metavar="File",
+                        help="Also run the command under cProfile and save the stats to this file")
+
+    return parser
@@ -1,5 +1,9 @@
 #!/usr/bin/python3
-"""This module contains the database connection code."""
+"""This module contains the database connection code.
+
+It is the one-time setup script, run as `python src/taskdb/database.py` rather than through the CLI, so it has no
+--profile option and isn't instrumented: the connect and execute spans are recorded by the pool and backends instead.
+"""
 import os
 import psycopg2
 from psycopg2 import sql
@@ -0,0 +1,239 @@
+#!/usr/bin/python3
+"""This module contains the optional instrumentation for TaskDB's hot paths.
+
+When it is enabled, every operation records timing spans (connect, execute, fetch, and render) and counts the queries
+and round trips it makes. Statements slower than a threshold are written to a slow-query log. The counters are printed
+by `taskdb --profile` or read with report(). Enable it with TASKDB_PROFILE=1, or set TASKDB_SLOW_QUERY_MS for the
+slow-query log alone. When it is disabled, the cost is one flag check per cursor and per span.
+"""
+import os, sys
+import threading
+import time
+from contextlib import nullcontext
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Statements that take at least this many milliseconds are logged. Unset means no slow-query log.
+TASKDB_SLOW_QUERY_MS: float | None = float(os.environ["TASKDB_SLOW_QUERY_MS"]) \
+    if os.getenv("TASKDB_SLOW_QUERY_MS") else None
+
+# The file slow statements are appended to (Default: standard error).
+TASKDB_SLOW_QUERY_LOG: str | None = os.getenv("TASKDB_SLOW_QUERY_LOG")
+
+TASKDB_PROFILE: bool = os.getenv("TASKDB_PROFILE", "").lower() in ("1", "true", "yes", "on")
+
+profiling: bool = TASKDB_PROFILE
+enabled: bool = profiling or TASKDB_SLOW_QUERY_MS is not None
+
+# The order spans are reported in.
+SPAN_NAMES: tuple = ("connect", "execute", "fetch", "render")
+
+_DISABLED_SPAN = nullcontext()
+_lock = threading.Lock()
+_spans: dict = {}
+_counters: dict = {"queries": 0, "round_trips": 0, "slow_queries": 0}
+_local = threading.local()
+
+
+def enable():
+    """Turns instrumentation on for the rest of the process, as --profile does.
+    :return: None
+    """
+    global enabled, profiling
+    enabled = profiling = True
+
+
+def disable():
+    """Returns instrumentation to what the environment variables ask for, undoing enable().
+    :return: None
+    """
+    global enabled, profiling
+    profiling = TASKDB_PROFILE
+    enabled = profiling or TASKDB_SLOW_QUERY_MS is not None
+
+
+def reset():
+    """Clears every span and counter.
+    :return: None
+    """
+    with _lock:
+        _spans.clear()
+        for counter_name in _counters:
+            _counters[counter_name] = 0
+
+
+def count(counter_name: str, amount: int = 1):
+    """Adds to one of the counters.
+    :param counter_name: "queries", "round_trips", or "slow_queries".
+    :param amount: The amount to add.
+    :return: None
+    """
+    with _lock:
+        _counters[counter_name] += amount
+
+
+class _Span:
+    """Times a block and records its self time: nested spans are subtracted, so the totals add up to the wall time."""
+    __slots__ = ("name", "start_time", "child_seconds")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.child_seconds: float = 0.0
+        stack: list = _local.__dict__.setdefault("stack", [])
+        stack.append(self)
+        self.start_time: float = time.perf_counter()
+        return self
+
+    def __exit__(self, *exception_info):
+        elapsed_seconds: float = time.perf_counter() - self.start_time
+        stack: list = _local.stack
+        stack.pop()
+        if stack:
+            stack[-1].child_seconds += elapsed_seconds
+        with _lock:
+            totals: list = _spans.setdefault(self.name, [0, 0.0])
+            totals[0] += 1
+            totals[1] += elapsed_seconds - self.child_seconds
+
+
+def span(name: str):
+    """Times a block of code under a span name, such as "connect" or "render".
+    :param name: The span's name.
+    :return: A context manager. It does nothing while instrumentation is disabled.
+    """
+    return _Span(name) if enabled else _DISABLED_SPAN
+
+
+def log_slow_query(query, elapsed_ms: float):
+    """Writes a statement to the slow-query log if it took at least TASKDB_SLOW_QUERY_MS.
+    :param query: The statement's SQL, as text or bytes.
+    :param elapsed_ms: How long the statement took in milliseconds.
+    :return: None
+    """
+    if TASKDB_SLOW_QUERY_MS is None or elapsed_ms < TASKDB_SLOW_QUERY_MS:
+        return
+    count("slow_queries")
+    query_text: str = query.decode(errors="replace") if isinstance(query, bytes) else str(query)
+    line: str = f"[taskdb slow query] {elapsed_ms:.1f}ms: {' '.join(query_text.split())}"
+    if TASKDB_SLOW_QUERY_LOG:
+        with open(os.path.expanduser(TASKDB_SLOW_QUERY_LOG), "a", encoding="utf-8") as log_file:
+            print(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {line}", file=log_file)
+    else:
+        print(line, file=sys.stderr)
+
+
+class InstrumentedCursor:
+    """Wraps a PostgreSQL or SQLite cursor to time its statements and fetches and to count round trips."""
+
+    def __init__(self, cursor, round_trip_fetches: bool):
+        """Wraps a cursor.
+        :param cursor: The driver's cursor.
+        :param round_trip_fetches: True for server-side cursors, whose fetches each go to the server.
+        """
+        self._cursor = cursor
+        self._round_trip_fetches = round_trip_fetches
+
+    def __getattr__(self, name: str):
+        return getattr(self._cursor, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception_info):
+        self._cursor.close()
+
+    def _timed(self, method, query, *arguments):
+        """Runs one statement inside an execute span and counts it.
+        :param method: The cursor method that runs the statement.
+        :param query: The statement's SQL.
+        :param arguments: The method's remaining arguments.
+        :return: Whatever the method returns.
+        """
+        start_time: float = time.perf_counter()
+        with span("execute"):
+            result = method(query, *arguments)
+        count("queries")
+        count("round_trips")
+        log_slow_query(query, (time.perf_counter() - start_time) * 1000)
+        return result
+
+    def execute(self, query, parameters=None):
+        if parameters is None:
+            return self._timed(self._cursor.execute, query)
+        return self._timed(self._cursor.execute, query, parameters)
+
+    def executemany(self, query, parameter_sets):
+        return self._timed(self._cursor.executemany, query, parameter_sets)
+
+    def copy_expert(self, query, file):
+        return self._timed(self._cursor.copy_expert, query, file)
+
+    def _fetch(self, method, *arguments):
+        """Runs one fetch inside a fetch span.
+        :param method: The cursor's fetch method.
+        :param arguments: The method's arguments.
+        :return: The fetched rows.
+        """
+        with span("fetch"):
+            rows = method(*arguments)
+        if self._round_trip_fetches:
+            count("round_trips")
+        return rows
+
+    def fetchone(self):
+        return self._fetch(self._cursor.fetchone)
+
+    def fetchmany(self, size: int | None = None):
+        if size is None:
+            size = self._cursor.itersize if self._round_trip_fetches else self._cursor.arraysize
+        return self._fetch(self._cursor.fetchmany, size)
+
+    def fetchall(self):
+        return self._fetch(self._cursor.fetchall)
+
+    def __iter__(self):
+        """Fetches rows in batches (itersize rows per round trip on server-side cursors), timing each batch.
+        :return: An iterator of rows.
+        """
+        batch_size: int | None = None if self._round_trip_fetches else max(self._cursor.arraysize, 100)
+        while True:
+            rows: list = self.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
+
+
+def report() -> dict:
+    """Returns what has been recorded since the last reset.
+    :return: A dict with each span's call count and total milliseconds, plus the counters.
+    """
+    with _lock:
+        spans: dict = {name: {"calls": calls, "total_ms": round(seconds * 1000, 3)}
+                       for name, (calls, seconds) in _spans.items()}
+        return {"spans": spans, **_counters}
+
+
+def print_report(command_name: str, wall_seconds: float, file=None):
+    """Prints the --profile breakdown of one command.
+    :param command_name: The command that ran.
+    :param wall_seconds: The command's total wall time in seconds.
+    :param file: Where to print (Default: standard error).
+    :return: None
+    """
+    file = file or sys.stderr
+    recorded: dict = report()
+    print(f"Profile of \"{command_name}\": {wall_seconds * 1000:.2f}ms total", file=file)
+    span_names: list = [name for name in SPAN_NAMES if name in recorded["spans"]] + \
+                       [name for name in recorded["spans"] if name not in SPAN_NAMES]
+    accounted_ms: float = 0.0
+    for name in span_names:
+        calls, total_ms = recorded["spans"][name]["calls"], recorded["spans"][name]["total_ms"]
+        accounted_ms += total_ms
+        print(f"  {name:<10}{total_ms:>10.2f}ms  ({calls} calls)", file=file)
+    print(f"  {'other':<10}{max(wall_seconds * 1000 - accounted_ms, 0.0):>10.2f}ms", file=file)
+    print(f"  queries: {recorded['queries']}, round trips: {recorded['round_trips']}, "
+          f"slow queries: {recorded['slow_queries']}", file=file)
@@ -0,0 +1,202 @@
+#!/usr/bin/python3
+"""This module contains the migration runner behind `taskdb migrate`.
+
+Migrations are the numbered modules in src/migrations (for example 003_add_primary_key_and_indexes.py). Each one
+defines upgrade(connection). Applied versions are recorded in the schema_migrations table, so every migration runs
+exactly once. All pending migrations are applied over one connection while holding an advisory lock, so two runners
+can't race. Consecutive transactional migrations share a single transaction. A migration that sets
+TRANSACTIONAL = False (CREATE INDEX CONCURRENTLY, large backfills) runs in autocommit mode between them instead.
+"""
+import importlib.util
+import os
+import re
+import sys
+from pathlib import Path
+import psycopg2
+from psycopg2 import sql
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+MIGRATIONS_DIRECTORY: Path = Path(os.getenv("TASKDB_MIGRATIONS_DIR",
+                                            Path(__file__).resolve().parent.parent / "migrations"))
+
+# Rows updated per statement by backfill_in_batches.
+TASKDB_MIGRATION_BATCH_SIZE: int = int(os.getenv("TASKDB_MIGRATION_BATCH_SIZE", "10000"))
+
+# Arbitrary, fixed key for pg_advisory_lock so only one runner applies migrations at a time.
+MIGRATION_LOCK_KEY: int = 0x7461736B6462  # "taskdb"
+
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d+)_(\w+)\.py$")
+
+
+def discover_migrations(directory: Path = MIGRATIONS_DIRECTORY) -> list:
+    """Finds the migration modules in a directory, ordered by version number.
+    :param directory: The directory holding the numbered migration files.
+    :return: A list of (version, name, path) tuples.
+    """
+    migrations: list = []
+    for path in directory.glob("*.py"):
+        match = MIGRATION_FILE_PATTERN.match(path.name)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), path))
+    return sorted(migrations)
+
+
+def load_migration(version: int, path: Path):
+    """Imports a migration module from its file. Its name starts with a digit, so it can't be imported normally.
+    :param version: The migration's version number.
+    :param path: The migration's file path.
+    :return: The imported module.
+    """
+    specification = importlib.util.spec_from_file_location(f"taskdb_migration_{version:03d}", path)
+    module = importlib.util.module_from_spec(specification)
+    specification.loader.exec_module(module)
+    return module
+
+
+def backfill_in_batches(connection, table: str, assignments: str, condition: str,
+                        batch_size: int = TASKDB_MIGRATION_BATCH_SIZE) -> int:
+    """Runs "UPDATE table SET assignments WHERE condition" over ranges of the table's physical pages (ctid), about
+    batch_size rows at a time. With an autocommit connection, each batch commits on its own, so row locks are held
+    briefly instead of for the whole table. Page ranges need no index, so this also works before migration 003 has
+    indexed task_id; PostgreSQL 14 and later read only each batch's pages with a TID range scan.
+    :param connection: A database connection, normally in autocommit mode.
+    :param table: The table to update.
+    :param assignments: The SET clause, such as "task_status = 'No status'".
+    :param condition: Rows to update, such as "task_status IS NULL". Keeps the backfill idempotent.
+    :param batch_size: The approximate number of rows per batch.
+    :return: The total number of rows updated.
+    """
+    with connection.cursor() as cursor:
+        # Re-running a migration on a table that is already backfilled costs one scan instead of one per batch.
+        cursor.execute(sql.SQL("SELECT EXISTS (SELECT 1 FROM {} WHERE {});").format(sql.Identifier(table),
+                                                                                    sql.SQL(condition)))
+        if not cursor.fetchone()[0]:
+            print(f"No rows of \"{table}\" need backfilling.")
+            return 0
+        cursor.execute("SELECT relpages, reltuples, pg_relation_size(oid) / current_setting('block_size')::int "
+                       "FROM pg_class WHERE oid = %s::regclass;", (table,))
+        estimated_pages, estimated_rows, page_count = cursor.fetchone()
+        rows_per_page: float = estimated_rows / estimated_pages if estimated_pages > 0 and estimated_rows > 0 else 100
+        pages_per_batch: int = max(1, int(batch_size / rows_per_page))
+        update_query = sql.SQL("UPDATE {} SET {} WHERE ctid >= %s::tid AND ctid < %s::tid AND ({});").format(
+            sql.Identifier(table), sql.SQL(assignments), sql.SQL(condition))
+        updated_count: int = 0
+        # Rows rewritten by a batch may move to later pages; the condition keeps them from being updated twice.
+        for first_page in range(0, page_count + 1, pages_per_batch):
+            cursor.execute(update_query, (f"({first_page},0)", f"({first_page + pages_per_batch},0)"))
+            updated_count += cursor.rowcount
+        print(f"Backfilled {updated_count} rows of \"{table}\" in batches of {pages_per_batch} pages.")
+        return updated_count
+
+
+def ensure_migrations_table(connection):
+    """Creates the schema_migrations table if it doesn't exist.
+    :param connection: A database connection.
+    :return: None
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("CREATE TABLE IF NOT EXISTS schema_migrations (version integer PRIMARY KEY, name text NOT NULL, "
+                       "applied_at timestamptz NOT NULL DEFAULT now());")
+    connection.commit()
+
+
+def applied_versions(connection) -> set:
+    """Reads the versions already recorded in schema_migrations.
+    :param connection: A database connection.
+    :return: A set of version numbers.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT version FROM schema_migrations;")
+        return {version for (version,) in cursor.fetchall()}
+
+
+def record_migration(connection, version: int, name: str):
+    """Records a migration as applied.
+    :param connection: A database connection.
+    :param version: The migration's version number.
+    :param name: The migration's name.
+    :return: None
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s);", (version, name))
+
+
+def apply_pending_migrations(connection, directory: Path = MIGRATIONS_DIRECTORY) -> list:
+    """Applies every migration that isn't recorded in schema_migrations, in version order.
+    :param connection: A database connection. Its autocommit setting is changed while migrating.
+    :param directory: The directory holding the numbered migration files.
+    :return: A list of the versions that were applied.
+    """
+    connection.autocommit = False
+    ensure_migrations_table(connection)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_lock(%s);", (MIGRATION_LOCK_KEY,))
+    connection.commit()
+    applied: list = []
+    try:
+        already_applied: set = applied_versions(connection)
+        connection.commit()
+        for version, name, path in discover_migrations(directory):
+            if version in already_applied:
+                continue
+            module = load_migration(version, path)
+            print(f"Applying migration {version:03d} ({name})...")
+            if getattr(module, "TRANSACTIONAL", True):
+                module.upgrade(connection)
+                record_migration(connection, version, name)
+            else:
+                # Finish the shared transaction first, then run this migration outside any transaction block.
+                connection.commit()
+                connection.autocommit = True
+                try:
+                    module.upgrade(connection)
+                    record_migration(connection, version, name)
+                finally:
+                    connection.autocommit = False
+            applied.append(version)
+        connection.commit()
+    except BaseException:
+        connection.rollback()
+        raise
+    finally:
+        if not connection.closed:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s);", (MIGRATION_LOCK_KEY,))
+    return applied
+
+
+def migrate():
+    """Connects to the taskdb database and applies all pending migrations, printing the outcome.
+    :return: A list of the versions that were applied, or None on error.
+    """
+    if os.getenv("TASKDB_BACKEND", "postgresql").lower() == "sqlite":
+        print("The SQLite backend creates its schema automatically. There is nothing to migrate.")
+        return []
+    connection = None
+    try:
+        connection = psycopg2.connect(
+            dbname=os.getenv("TASKDB_NAME"),
+            user=os.getenv("TASKDB_USER"),
+            password=os.getenv("TASKDB_PASSWORD"),
+            host=os.getenv("TASKDB_HOST"),
+            port=os.getenv("TASKDB_PORT")
+        )
+        applied: list = apply_pending_migrations(connection)
+        if applied:
+            print(f"Applied {len(applied)} migration(s): {', '.join(f'{version:03d}' for version in applied)}.")
+        else:
+            print("The database is up to date. No migrations to apply.")
+        return applied
+    except psycopg2.Error as error:
+        print(f"Error applying migrations: {error}", file=sys.stderr)
+    finally:
+        if connection:
+            connection.close()
+
+
+if __name__ == "__main__":
+    migrate()
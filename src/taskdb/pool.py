@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+"""This module contains the database connection pool shared by all task operations."""
+import os, sys
+import threading
+from contextlib import contextmanager
+import psycopg2
+from psycopg2 import pool
+from dotenv import load_dotenv
+from . import instrumentation
+from .prepared import connection_options
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Pool sizing, read from the same .env file as the connection details.
+TASKDB_POOL_MIN_SIZE: int = int(os.getenv("TASKDB_POOL_MIN_SIZE", "1"))
+TASKDB_POOL_MAX_SIZE: int = int(os.getenv("TASKDB_POOL_MAX_SIZE", "10"))
+
+_connection_pool: pool.ThreadedConnectionPool | None = None
+_connection_pool_lock = threading.Lock()
+
+
+def get_connection_pool() -> pool.ThreadedConnectionPool:
+    """Returns the process-wide connection pool, creating it on first use.
+    :return: A ThreadedConnectionPool connected to the taskdb database.
+    """
+    global _connection_pool
+    with _connection_pool_lock:
+        if _connection_pool is None or _connection_pool.closed:
+            try:
+                _connection_pool = pool.ThreadedConnectionPool(
+                    TASKDB_POOL_MIN_SIZE,
+                    TASKDB_POOL_MAX_SIZE,
+                    dbname=os.getenv("TASKDB_NAME"),
+                    user=os.getenv("TASKDB_USER"),
+                    password=os.getenv("TASKDB_PASSWORD"),
+                    host=os.getenv("TASKDB_HOST"),
+                    port=os.getenv("TASKDB_PORT"),
+                    **connection_options()
+                )
+            except psycopg2.OperationalError as error:
+                print(f"Error: Could not connect to the database. Have you run the setup script in database.py?",
+                      file=sys.stderr)
+                print(f"Details: {error}", file=sys.stderr)
+                sys.exit(1)
+        return _connection_pool
+
+
+def close_connection_pool():
+    """Closes every connection held by the pool. The next checkout creates a new pool.
+    :return: None
+    """
+    global _connection_pool
+    with _connection_pool_lock:
+        if _connection_pool is not None and not _connection_pool.closed:
+            _connection_pool.closeall()
+        _connection_pool = None
+
+
+def is_connection_healthy(connection) -> bool:
+    """Checks that a pooled connection is still usable by sending a trivial query.
+    :param connection: A connection checked out of the pool.
+    :return: True if the server answered, but False if the connection is broken.
+    """
+    if connection.closed:
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1;")
+        connection.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+
+@contextmanager
+def borrow_connection():
+    """Checks a healthy connection out of the pool and returns it when the block exits.
+    A connection that fails the health check is discarded and replaced with a fresh one.
+    :return: A context manager yielding a database connection.
+    """
+    try:
+        with instrumentation.span("connect"):
+            connection_pool = get_connection_pool()
+            connection = connection_pool.getconn()
+            if not is_connection_healthy(connection):
+                connection_pool.putconn(connection, close=True)
+                connection = connection_pool.getconn()
+        if instrumentation.enabled:
+            # The health check's SELECT 1 and rollback.
+            instrumentation.count("round_trips", 2)
+    except psycopg2.OperationalError as error:
+        print(f"Error: Could not connect to the database. Have you run the setup script in database.py?",
+              file=sys.stderr)
+        print(f"Details: {error}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        yield connection
+    finally:
+        connection_pool.putconn(connection, close=bool(connection.closed))
@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+"""This module contains the server-side prepared statements for the fixed task queries.
+
+Pooled PostgreSQL connections use PreparingConnection. The first time a connection runs one of the fixed statements in
+queries.py (adding a task, the batch delete and updates, and the tasks_version check), it sends PREPARE. Every later
+call on that connection sends EXECUTE with just the parameters, so the server parses and plans the statement once per
+connection instead of once per call. Set TASKDB_PREPARE_STATEMENTS=0 to turn this off.
+"""
+import os
+import re
+from psycopg2 import errors, extensions
+from dotenv import load_dotenv
+from . import queries
+
+# Load environment variables from .env file
+load_dotenv()
+
+TASKDB_PREPARE_STATEMENTS: bool = os.getenv("TASKDB_PREPARE_STATEMENTS", "1").lower() not in ("0", "false", "off")
+
+# The statement name and parameter types of each fixed query. The listing SELECT isn't here: it streams through a
+# server-side cursor, and PostgreSQL can't DECLARE a cursor for a prepared statement.
+PREPARED_STATEMENTS: dict = {
+    queries.ADD_TASK: ("taskdb_add_task", ("text",)),
+    queries.DELETE_TASKS: ("taskdb_delete_tasks", ("integer[]",)),
+    queries.UPDATE_TASKS_STATUS: ("taskdb_update_tasks_status", ("text", "integer[]")),
+    queries.UPDATE_TASKS_DESCRIPTION: ("taskdb_update_tasks_description", ("text", "integer[]")),
+    queries.TASKS_VERSION: ("taskdb_tasks_version", ()),
+}
+
+
+def build_prepare(query: str, name: str, parameter_types: tuple) -> str:
+    """Builds the PREPARE statement for a query written with %s placeholders.
+    :param query: The query, as used with cursor.execute.
+    :param name: The prepared statement's name.
+    :param parameter_types: The PostgreSQL type of each placeholder, in order.
+    :return: The PREPARE statement.
+    """
+    placeholder_numbers = iter(range(1, len(parameter_types) + 1))
+    body: str = re.sub(r"%s", lambda match: f"${next(placeholder_numbers)}", query).rstrip(";")
+    types: str = f" ({', '.join(parameter_types)})" if parameter_types else ""
+    return f"PREPARE {name}{types} AS {body};"
+
+
+def build_execute(name: str, parameter_count: int) -> str:
+    """Builds the EXECUTE statement for a prepared statement.
+    :param name: The prepared statement's name.
+    :param parameter_count: The number of parameters it takes.
+    :return: The EXECUTE statement, with %s placeholders for the parameters.
+    """
+    return f"EXECUTE {name} ({', '.join(['%s'] * parameter_count)});" if parameter_count else f"EXECUTE {name};"
+
+
+PREPARE_STATEMENTS: dict = {query: build_prepare(query, name, parameter_types)
+                            for query, (name, parameter_types) in PREPARED_STATEMENTS.items()}
+EXECUTE_STATEMENTS: dict = {query: build_execute(name, len(parameter_types))
+                            for query, (name, parameter_types) in PREPARED_STATEMENTS.items()}
+
+
+class PreparingCursor(extensions.cursor):
+    """A cursor that runs the fixed task queries as EXECUTE of a statement prepared on its connection."""
+
+    def execute(self, query, parameters=None):
+        execute_statement: str | None = EXECUTE_STATEMENTS.get(query) if self.name is None else None
+        if execute_statement is None:
+            return super().execute(query, parameters)
+        prepared: set = self.connection.prepared_statements
+        if query not in prepared:
+            super().execute(PREPARE_STATEMENTS[query])
+            prepared.add(query)
+            return super().execute(execute_statement, parameters)
+        # The session may have lost its prepared statements (DISCARD ALL, or a pooler handing out another backend).
+        # At the start of a transaction there is nothing to lose, so a failed EXECUTE is simply rolled back. Inside one,
+        # a savepoint limits the rollback to the EXECUTE, keeping the statements that ran before it.
+        in_transaction: bool = self.connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE
+        if in_transaction:
+            super().execute("SAVEPOINT taskdb_prepared;")
+        try:
+            super().execute(execute_statement, parameters)
+        except errors.InvalidSqlStatementName:
+            if in_transaction:
+                super().execute("ROLLBACK TO SAVEPOINT taskdb_prepared;")
+            else:
+                self.connection.rollback()
+            prepared.clear()
+            super().execute(PREPARE_STATEMENTS[query])
+            prepared.add(query)
+            super().execute(execute_statement, parameters)
+        if in_transaction:
+            # RELEASE would replace this EXECUTE's result, so it runs on a separate cursor.
+            with self.connection.cursor() as release_cursor:
+                release_cursor.execute("RELEASE SAVEPOINT taskdb_prepared;")
+
+
+class PreparingConnection(extensions.connection):
+    """A connection that remembers which statements it has prepared. A replacement connection starts empty, so its
+    statements are prepared again on first use."""
+
+    def __init__(self, *arguments, **keyword_arguments):
+        super().__init__(*arguments, **keyword_arguments)
+        self.prepared_statements: set = set()
+        self.cursor_factory = PreparingCursor
+
+
+def connection_options() -> dict:
+    """Returns the extra psycopg2.connect() arguments for pooled connections.
+    :return: A dict selecting PreparingConnection, or an empty dict if TASKDB_PREPARE_STATEMENTS is off.
+    """
+    return {"connection_factory": PreparingConnection} if TASKDB_PREPARE_STATEMENTS else {}
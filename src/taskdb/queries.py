@@ -0,0 +1,125 @@
+#!/usr/bin/python3
+"""This module contains the SQL shared by the synchronous and asyncio task operations."""
+
+TASK_COLUMNS: str = "task_id, task, task_status, task_date_and_time, task_status_date_and_time"
+
+ADD_TASK: str = f"INSERT INTO tasks (task, task_date_and_time, task_status) VALUES (%s, now(), 'NOT STARTED') " \
+                f"RETURNING {TASK_COLUMNS};"
+
+DELETE_TASKS: str = "DELETE FROM tasks WHERE task_id = ANY(%s) RETURNING task_id;"
+
+UPDATE_TASKS_STATUS: str = "UPDATE tasks SET task_status = %s, task_status_date_and_time = now() " \
+                           "WHERE task_id = ANY(%s) RETURNING task_id;"
+
+UPDATE_TASKS_DESCRIPTION: str = "UPDATE tasks SET task = %s, task_date_and_time = now() " \
+                                "WHERE task_id = ANY(%s) RETURNING task_id;"
+
+# Bumped by a trigger on every statement that changes tasks (migration 004). Used to check cached listings.
+# The counter and the random generation id (migration 008) that cached listings are checked against.
+TASKS_VERSION: str = "SELECT version, generation FROM tasks_version;"
+
+# Moves one batch of completed tasks into tasks_archive (migration 007) in a single statement. The parameters are the
+# cutoff timestamp and the batch size. SKIP LOCKED leaves rows another transaction is changing for a later run.
+ARCHIVE_TASKS: str = \
+    "WITH archived AS (DELETE FROM tasks WHERE task_id IN (" \
+    "SELECT task_id FROM tasks WHERE task_status = 'COMPLETED' AND task_status_date_and_time < %s " \
+    f"ORDER BY task_status_date_and_time, task_id LIMIT %s FOR UPDATE SKIP LOCKED) RETURNING {TASK_COLUMNS}) " \
+    f"INSERT INTO tasks_archive ({TASK_COLUMNS}) SELECT {TASK_COLUMNS} FROM archived;"
+
+# The NOTIFY channel the migration 006 triggers announce task changes on.
+TASK_CHANGES_CHANNEL: str = "taskdb_task_changes"
+
+# The labels of the age buckets in TASK_STATS, in bucket order.
+AGE_BUCKETS: tuple = ("Under 1 day", "1-7 days", "1-4 weeks", "1-3 months", "Over 3 months")
+
+# Status counts, the age histogram of open tasks, and completions per week, all from one scan of tasks. Each row is
+# (statistic, key, count). The parameter is how many whole weeks before the current one to count completions for.
+TASK_STATS: str = \
+    "SELECT CASE GROUPING(task_status, age_bucket, completed_week) WHEN 3 THEN 'status' WHEN 5 THEN 'age' " \
+    "ELSE 'week' END AS statistic, COALESCE(task_status, age_bucket::text, completed_week::text) AS key, count(*) " \
+    "FROM (SELECT task_status, " \
+    "CASE WHEN task_status = 'COMPLETED' OR task_date_and_time IS NULL THEN NULL " \
+    "WHEN task_date_and_time > now() - interval '1 day' THEN 0 " \
+    "WHEN task_date_and_time > now() - interval '7 days' THEN 1 " \
+    "WHEN task_date_and_time > now() - interval '30 days' THEN 2 " \
+    "WHEN task_date_and_time > now() - interval '90 days' THEN 3 ELSE 4 END AS age_bucket, " \
+    "CASE WHEN task_status = 'COMPLETED' AND task_status_date_and_time >= " \
+    "date_trunc('week', now()) - %s * interval '1 week' " \
+    "THEN date_trunc('week', task_status_date_and_time)::date END AS completed_week " \
+    "FROM tasks) AS classified " \
+    "GROUP BY GROUPING SETS ((task_status), (age_bucket), (completed_week));"
+
+
+def build_list_query(status_filter: str | None = None, limit: int | None = None, offset: int | None = None,
+                     after_id: int | None = None, include_archive: bool = False) -> tuple:
+    """Builds the SELECT used to list tasks.
+    :param status_filter: An optional status ('NOT STARTED', 'STARTED', or 'COMPLETED') for filtering.
+    :param limit: An optional maximum number of tasks to list.
+    :param offset: An optional number of matching tasks to skip before listing.
+    :param after_id: An optional task number; only tasks with a higher number are listed (keyset pagination).
+    :param include_archive: Also list the tasks moved to tasks_archive, in task number order with the rest.
+    :return: A tuple of the query string and its list of parameters.
+    """
+    query = f"SELECT {TASK_COLUMNS} FROM tasks"
+    if include_archive:
+        query = f"SELECT {TASK_COLUMNS} FROM (SELECT {TASK_COLUMNS} FROM tasks " \
+                f"UNION ALL SELECT {TASK_COLUMNS} FROM tasks_archive) AS all_tasks"
+    conditions = []
+    parameters = []
+
+    if status_filter:
+        conditions.append("task_status = %s")
+        parameters.append(status_filter)
+    if after_id is not None:
+        conditions.append("task_id > %s")
+        parameters.append(after_id)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+
+    query += " ORDER BY task_id"
+
+    if limit is not None:
+        query += " LIMIT %s"
+        parameters.append(limit)
+    if offset is not None:
+        query += " OFFSET %s"
+        parameters.append(offset)
+
+    return query, parameters
+
+
+def build_search_query(terms: str, status_filter: str | None = None, limit: int | None = None,
+                       fuzzy: bool = False) -> tuple:
+    """Builds the ranked full-text SELECT used to search task descriptions (migration 005).
+    :param terms: The search terms, in websearch syntax ("quoted phrases", -excluded, or).
+    :param status_filter: An optional status ('NOT STARTED', 'STARTED', or 'COMPLETED') for filtering.
+    :param limit: An optional maximum number of tasks to return.
+    :param fuzzy: Also match descriptions that merely resemble the terms, using pg_trgm word similarity.
+    :return: A tuple of the query string and its list of parameters.
+    """
+    if fuzzy:
+        # Either GIN index can answer its half of the OR, and the planner combines them with a BitmapOr.
+        query = f"SELECT {TASK_COLUMNS} FROM tasks, websearch_to_tsquery('english', %s) AS search_query " \
+                "WHERE (task_search @@ search_query OR %s <%% task)"
+        rank = "greatest(ts_rank(task_search, search_query), word_similarity(%s, task))"
+        parameters = [terms, terms]
+        rank_parameters = [terms]
+    else:
+        query = f"SELECT {TASK_COLUMNS} FROM tasks, websearch_to_tsquery('english', %s) AS search_query " \
+                "WHERE task_search @@ search_query"
+        rank = "ts_rank(task_search, search_query)"
+        parameters = [terms]
+        rank_parameters = []
+
+    if status_filter:
+        query += " AND task_status = %s"
+        parameters.append(status_filter)
+
+    query += f" ORDER BY {rank} DESC, task_id"
+    parameters.extend(rank_parameters)
+
+    if limit is not None:
+        query += " LIMIT %s"
+        parameters.append(limit)
+
+    return query, parameters
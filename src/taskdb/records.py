@@ -0,0 +1,50 @@
+#!/usr/bin/python3
+"""This module contains the lightweight records returned by the task APIs."""
+from datetime import datetime
+from typing import NamedTuple
+
+
+class Task(NamedTuple):
+    """One row of the tasks table."""
+    task_id: int
+    task: str
+    task_status: str | None
+    task_date_and_time: datetime | None
+    task_status_date_and_time: datetime | None
+
+
+class MutationResult(NamedTuple):
+    """The outcome of a statement that changes several tasks at once."""
+    found_task_ids: list
+    missing_task_ids: list
+
+    @classmethod
+    def from_rows(cls, task_ids: list, rows: list):
+        """Builds the result of a statement from the task_id rows its RETURNING clause produced.
+        :param task_ids: The task numbers that were requested.
+        :param rows: The (task_id,) rows the statement returned.
+        :return: A MutationResult with the found task numbers sorted and the missing ones in the requested order.
+        """
+        found_task_ids: set = {task_id for (task_id,) in rows}
+        return cls(sorted(found_task_ids), [task_id for task_id in task_ids if task_id not in found_task_ids])
+
+
+class TaskChange(NamedTuple):
+    """One change announced by the tasks change feed (migration 006). A statement that changed too many rows to announce
+    one by one is reported as a single change with no task_id and the number of rows in count."""
+    operation: str
+    task_id: int | None
+    task_status: str | None
+    count: int
+
+
+class TaskStats(NamedTuple):
+    """A summary of the tasks table, as computed by TaskRepository.get_stats."""
+    status_counts: dict
+    age_histogram: dict
+    completions_per_week: list
+
+    @property
+    def total(self) -> int:
+        """The number of tasks in every status."""
+        return sum(self.status_counts.values())
@@ -0,0 +1,159 @@
+#!/usr/bin/python3
+"""This module contains the renderers that print task listings.
+
+Rows are formatted into a list of lines and written to the output in chunks, instead of one print() per row. Dates go
+through a small cache, since a listing repeats the same few days many times. Besides the original text lines, listings
+can be printed as tab-separated values, JSON Lines, or an aligned table, which are easier for other tools to consume.
+"""
+import re
+import sys
+from datetime import date
+from functools import lru_cache
+from json.encoder import encode_basestring_ascii
+
+OUTPUT_FORMATS: tuple = ("text", "tsv", "json", "table")
+
+# Rows formatted before each write to the output.
+RENDER_BATCH_SIZE: int = 1000
+
+TSV_COLUMNS: tuple = ("task_id", "task", "task_status", "task_date_and_time", "task_status_date_and_time")
+
+# Backslash, tab, and line breaks would break a TSV row, so they are written as escape sequences.
+TSV_ESCAPES: dict = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+TSV_SPECIAL_CHARACTERS = re.compile(r"[\\\t\n\r]")
+
+TABLE_HEADINGS: tuple = ("ID", "Task", "Status", "Added", "Modified")
+
+
+@lru_cache(maxsize=4096)
+def format_day(day: date) -> str:
+    """Formats a calendar day the way the text listing shows it.
+    :param day: A date.
+    :return: The date as MM/DD/YYYY.
+    """
+    return day.strftime("%m/%d/%Y")
+
+
+def format_text_line(task) -> str:
+    """Formats one task as the original list line.
+    :param task: A Task record.
+    :return: The task as a single line of text, without a line break.
+    """
+    # Provide a default status for display if it's None in the DB
+    status_display: str = task.task_status if task.task_status else "Not Started"
+    task_added_date: str = format_day(task.task_date_and_time.date())
+    task_modified_date: str = format_day(task.task_status_date_and_time.date()) \
+        if task.task_status_date_and_time is not None else "Never"
+    return f"Task # {task.task_id} | {task.task} | Task Status: {status_display} | Task Added On: {task_added_date} " \
+           f"| Task Modified On: {task_modified_date}"
+
+
+def format_tsv_line(task) -> str:
+    """Formats one task as a tab-separated row, with ISO-8601 timestamps and empty fields for missing values.
+    :param task: A Task record.
+    :return: The row, without a line break.
+    """
+    description: str = task.task.translate(TSV_ESCAPES) if TSV_SPECIAL_CHARACTERS.search(task.task) else task.task
+    return f"{task.task_id}\t{description}\t{task.task_status or ''}\t" \
+           f"{task.task_date_and_time.isoformat() if task.task_date_and_time else ''}\t" \
+           f"{task.task_status_date_and_time.isoformat() if task.task_status_date_and_time else ''}"
+
+
+def format_json_line(task) -> str:
+    """Formats one task as a JSON object, with ISO-8601 timestamps. The object is assembled directly instead of
+    through a dict and json.dumps, since only the two strings need escaping.
+    :param task: A Task record.
+    :return: The object as one line of JSON, without a line break.
+    """
+    task_status: str = encode_basestring_ascii(task.task_status) if task.task_status is not None else "null"
+    added: str = f'"{task.task_date_and_time.isoformat()}"' if task.task_date_and_time else "null"
+    modified: str = f'"{task.task_status_date_and_time.isoformat()}"' if task.task_status_date_and_time else "null"
+    return f'{{"task_id": {task.task_id}, "task": {encode_basestring_ascii(task.task)}, ' \
+           f'"task_status": {task_status}, "task_date_and_time": {added}, "task_status_date_and_time": {modified}}}'
+
+
+def table_cells(task) -> tuple:
+    """Lists the cells of one table row.
+    :param task: A Task record.
+    :return: A tuple of strings.
+    """
+    return (str(task.task_id), task.task, task.task_status or "Not Started",
+            format_day(task.task_date_and_time.date()) if task.task_date_and_time else "",
+            format_day(task.task_status_date_and_time.date()) if task.task_status_date_and_time else "Never")
+
+
+def write_lines(lines: list, file):
+    """Writes a batch of lines to the output with a single write call.
+    :param lines: The lines, without line breaks.
+    :param file: A writable text file object.
+    :return: None
+    """
+    lines.append("")
+    file.write("\n".join(lines))
+
+
+def render_table(tasks, file) -> int:
+    """Prints tasks as an aligned table. Column widths are taken from the first batch of rows, so the table can still
+    be streamed; a longer value later on widens only its own row.
+    :param tasks: An iterable of Task records.
+    :param file: A writable text file object.
+    :return: The number of tasks printed.
+    """
+    task_count: int = 0
+    batch: list = []
+    row_format: str | None = None
+    for task in tasks:
+        batch.append(table_cells(task))
+        task_count += 1
+        if len(batch) >= RENDER_BATCH_SIZE:
+            row_format = row_format or table_row_format(batch, file)
+            write_lines([row_format.format(*cells) for cells in batch], file)
+            batch = []
+    if batch:
+        row_format = row_format or table_row_format(batch, file)
+        write_lines([row_format.format(*cells) for cells in batch], file)
+    return task_count
+
+
+def table_row_format(rows: list, file) -> str:
+    """Works out the column widths from a batch of rows and prints the table's heading.
+    :param rows: A list of cell tuples.
+    :param file: A writable text file object.
+    :return: A str.format pattern for one row.
+    """
+    widths: list = [max(len(heading), *(len(cells[column]) for cells in rows))
+                    for column, heading in enumerate(TABLE_HEADINGS)]
+    # The last column isn't padded, so rows don't end in spaces.
+    row_format: str = " | ".join([f"{{:>{widths[0]}}}"] + [f"{{:<{width}}}" for width in widths[1:-1]] + ["{}"])
+    write_lines([row_format.format(*TABLE_HEADINGS), "-+-".join("-" * width for width in widths)], file)
+    return row_format
+
+
+LINE_FORMATTERS: dict = {"text": format_text_line, "tsv": format_tsv_line, "json": format_json_line}
+
+
+def render_tasks(tasks, output_format: str = "text", file=None) -> int:
+    """Prints tasks in one of OUTPUT_FORMATS, writing RENDER_BATCH_SIZE rows at a time.
+    :param tasks: An iterable of Task records. It is consumed lazily, so streamed listings stay streamed.
+    :param output_format: 'text' (Default), 'tsv', 'json' (JSON Lines), or 'table'.
+    :param file: A writable text file object (Default: standard output).
+    :return: The number of tasks printed.
+    """
+    file = file or sys.stdout
+    if output_format == "table":
+        return render_table(tasks, file)
+
+    format_line = LINE_FORMATTERS[output_format]
+    task_count: int = 0
+    batch: list = []
+    if output_format == "tsv":
+        batch.append("\t".join(TSV_COLUMNS))
+    for task in tasks:
+        batch.append(format_line(task))
+        task_count += 1
+        if len(batch) >= RENDER_BATCH_SIZE:
+            write_lines(batch, file)
+            batch = []
+    if batch:
+        write_lines(batch, file)
+    return task_count
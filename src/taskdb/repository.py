@@ -0,0 +1,279 @@
+#!/usr/bin/python3
+"""This module contains the TaskRepository, the data-access layer behind the CLI.
+
+Every method returns Task or MutationResult records (or plain counts) instead of printing, so the repository can be used
+directly from Python to batch, cache, and compose task operations:
+
+    from taskdb.repository import TaskRepository
+
+    repository = TaskRepository()
+    for task in repository.iter_tasks("STARTED"):
+        ...
+"""
+import os
+from datetime import date, datetime, timedelta, timezone
+from dotenv import load_dotenv
+from .backends import get_backend
+from .cache import TaskCache
+from .records import Task, MutationResult, TaskStats
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Rows fetched per round trip by the server-side cursor in iter_tasks.
+TASKDB_LIST_ITERSIZE: int = int(os.getenv("TASKDB_LIST_ITERSIZE", "2000"))
+
+# Tasks moved per transaction by archive_tasks.
+TASKDB_ARCHIVE_BATCH_SIZE: int = int(os.getenv("TASKDB_ARCHIVE_BATCH_SIZE", "5000"))
+
+
+class TaskRepository:
+    """Reads and writes tasks through a storage backend (PostgreSQL or SQLite)."""
+
+    def __init__(self, backend=None, itersize: int = TASKDB_LIST_ITERSIZE, cache: TaskCache | None = None):
+        """Creates a repository. No connection is opened until the first operation.
+        :param backend: An optional storage backend (Default: the one chosen by TASKDB_BACKEND).
+        :param itersize: The default number of rows fetched per round trip while listing.
+        :param cache: An optional TaskCache that listings are read through.
+        """
+        self.backend = backend or get_backend()
+        self.queries = self.backend.queries
+        self.itersize = itersize
+        self.cache = cache
+
+    def _read_version(self, connection) -> str | None:
+        """Reads the tasks_version counter and generation id that cached listings are checked against.
+        :param connection: A database connection.
+        :return: The generation and version as one string, or None if migrations 004 and 008 haven't been applied.
+        """
+        try:
+            with connection:
+                with self.backend.cursor(connection) as cursor:
+                    cursor.execute(self.queries.TASKS_VERSION)
+                    row = cursor.fetchone()
+                    return f"{row[1]}:{row[0]}" if row else None
+        except (self.backend.UndefinedTable, self.backend.UndefinedColumn):
+            return None
+
+    def _invalidate_cache(self):
+        """Drops cached listings after this repository changes tasks.
+        :return: None
+        """
+        if self.cache is not None:
+            self.cache.invalidate()
+
+    def iter_tasks(self, status_filter: str | None = None, limit: int | None = None, offset: int | None = None,
+                   after_id: int | None = None, itersize: int | None = None, include_archive: bool = False):
+        """Lazily streams tasks (through a server-side cursor on PostgreSQL), holding a connection until the iterator
+        is exhausted or closed.
+        :param status_filter: An optional status ('NOT STARTED', 'STARTED', or 'COMPLETED') for filtering.
+        :param limit: An optional maximum number of tasks to list.
+        :param offset: An optional number of matching tasks to skip before listing.
+        :param after_id: An optional task number; only tasks with a higher number are listed (keyset pagination).
+        :param itersize: An optional number of rows fetched per round trip.
+        :param include_archive: Also list the tasks moved to tasks_archive by archive_tasks.
+        :return: An iterator of Task records.
+        """
+        query, parameters = self.queries.build_list_query(status_filter, limit, offset, after_id, include_archive)
+        with self.backend.connection() as connection:
+            cache_key: str | None = None
+            if self.cache is not None:
+                # The version is read before the listing, so a cached listing is never older than its version.
+                version: str | None = self._read_version(connection)
+                cache_key = self.cache.make_key(self.backend.identity, status_filter, limit, offset, after_id,
+                                                include_archive)
+                cached_tasks: list | None = self.cache.get(cache_key, version)
+                if cached_tasks is not None:
+                    yield from cached_tasks
+                    return
+
+            with connection:
+                with self.backend.cursor(connection, "taskdb_list_tasks", itersize or self.itersize) as cursor:
+                    cursor.execute(query, parameters)
+                    collected_tasks: list | None = [] if cache_key is not None else None
+                    for row in cursor:
+                        task = Task(*row)
+                        if collected_tasks is not None:
+                            collected_tasks.append(task)
+                            if len(collected_tasks) > self.cache.max_rows:
+                                collected_tasks = None
+                        yield task
+            if collected_tasks is not None:
+                self.cache.put(cache_key, version, collected_tasks)
+
+    def list_tasks(self, status_filter: str | None = None, limit: int | None = None, offset: int | None = None,
+                   after_id: int | None = None, include_archive: bool = False) -> list:
+        """Lists tasks into memory. Prefer iter_tasks for large result sets.
+        :param status_filter: An optional status ('NOT STARTED', 'STARTED', or 'COMPLETED') for filtering.
+        :param limit: An optional maximum number of tasks to list.
+        :param offset: An optional number of matching tasks to skip before listing.
+        :param after_id: An optional task number; only tasks with a higher number are listed (keyset pagination).
+        :param include_archive: Also list the tasks moved to tasks_archive by archive_tasks.
+        :return: A list of Task records.
+        """
+        return list(self.iter_tasks(status_filter, limit, offset, after_id, include_archive=include_archive))
+
+    def search_tasks(self, terms: str, status_filter: str | None = None, limit: int | None = None,
+                     fuzzy: bool = False) -> list:
+        """Searches task descriptions, best matches first. On PostgreSQL this uses the task_search GIN index from
+        migration 005, and fuzzy matching uses its pg_trgm index.
+        :param terms: The search terms ("quoted phrases" and -excluded words are supported on PostgreSQL).
+        :param status_filter: An optional status ('NOT STARTED', 'STARTED', or 'COMPLETED') for filtering.
+        :param limit: An optional maximum number of tasks to return.
+        :param fuzzy: Also match descriptions that only resemble the terms, such as misspellings.
+        :return: A list of Task records, ordered by rank.
+        """
+        query, parameters = self.queries.build_search_query(terms, status_filter, limit, fuzzy)
+        with self.backend.connection() as connection:
+            with connection:
+                with self.backend.cursor(connection) as cursor:
+                    cursor.execute(query, parameters)
+                    return [Task(*row) for row in cursor.fetchall()]
+
+    def get_stats(self, weeks: int = 8) -> TaskStats:
+        """Summarizes the tasks table with one grouped query: the number of tasks in each status, how long open tasks
+        have been waiting (by task_date_and_time), and how many tasks were completed each week (by
+        task_status_date_and_time).
+        :param weeks: The number of weeks of completions to report, counting the current one.
+        :return: A TaskStats record. Weeks without completions are included with a count of 0.
+        """
+        with self.backend.connection() as connection:
+            with connection:
+                with self.backend.cursor(connection) as cursor:
+                    cursor.execute(self.queries.TASK_STATS, (weeks - 1,))
+                    rows: list = cursor.fetchall()
+
+        status_counts: dict = {}
+        age_histogram: dict = dict.fromkeys(self.queries.AGE_BUCKETS, 0)
+        current_week: date = date.today() - timedelta(days=date.today().weekday())
+        completions: dict = {current_week - timedelta(weeks=weeks_back): 0 for weeks_back in range(weeks - 1, -1, -1)}
+        for statistic, key, task_count in rows:
+            if statistic == "status":
+                status_counts[key] = task_count
+            elif key is None:
+                continue
+            elif statistic == "age":
+                age_histogram[self.queries.AGE_BUCKETS[int(key)]] = task_count
+            else:
+                week_start: date = key if isinstance(key, date) else date.fromisoformat(key)
+                completions[week_start] = completions.get(week_start, 0) + task_count
+        return TaskStats(status_counts, age_histogram, sorted(completions.items()))
+
+    def watch_changes(self, status_filter: str | None = None, timeout: float | None = None):
+        """Streams inserts, updates, and deletes as they are committed, without polling (PostgreSQL with migration 006
+        only). Summaries of bulk changes have no status, so they are always included.
+        :param status_filter: Only report changes that leave a task in this status, or deletions of one in it.
+        :param timeout: Stop after this many seconds without a change (Default: wait forever).
+        :return: An iterator of TaskChange records.
+        """
+        for change in self.backend.iter_changes(timeout):
+            if status_filter is None or change.task_id is None or change.task_status == status_filter:
+                yield change
+
+    def add_task(self, description: str) -> Task:
+        """Adds a task, along with the current date and time, to the database.
+        :param description: A string of the task's description.
+        :return: The new task as a Task record.
+        """
+        with self.backend.connection() as connection:
+            with connection:
+                with self.backend.cursor(connection) as cursor:
+                    cursor.execute(self.queries.ADD_TASK, (description,))
+                    task = Task(*cursor.fetchone())
+                    self.backend.bump_version(cursor)
+        self._invalidate_cache()
+        return task
+
+    def _mutate_tasks(self, query: str, parameters: tuple, task_ids: list) -> MutationResult:
+        """Runs one set-based statement against several tasks and reports which of them it touched.
+        :param query: A statement ending in RETURNING task_id.
+        :param parameters: The statement's parameters.
+        :param task_ids: The task numbers that were requested.
+        :return: A MutationResult listing the found and missing task numbers.
+        """
+        with self.backend.connection() as connection:
+            with connection:
+                with self.backend.cursor(connection) as cursor:
+                    cursor.execute(query, parameters)
+                    result = MutationResult.from_rows(task_ids, cursor.fetchall())
+                    if result.found_task_ids:
+                        self.backend.bump_version(cursor)
+        self._invalidate_cache()
+        return result
+
+    def delete_tasks(self, task_ids: list) -> MutationResult:
+        """Deletes several tasks from the database in a single transaction.
+        :param task_ids: The ID numbers of the tasks as a list of ints.
+        :return: A MutationResult listing the deleted and missing task numbers.
+        """
+        return self._mutate_tasks(self.queries.DELETE_TASKS, (self.backend.task_id_list(task_ids),), task_ids)
+
+    def add_tasks_status(self, task_ids: list, task_status: str) -> MutationResult:
+        """Adds the same status, along with the current date and time, to several tasks in a single transaction.
+        :param task_ids: The ID numbers of the tasks as a list of ints.
+        :param task_status: The tasks' status (NOT STARTED, STARTED, or COMPLETED)
+        :return: A MutationResult listing the updated and missing task numbers.
+        """
+        return self._mutate_tasks(self.queries.UPDATE_TASKS_STATUS,
+                                  (task_status.upper(), self.backend.task_id_list(task_ids)), task_ids)
+
+    def update_tasks_description(self, task_ids: list, new_description: str) -> MutationResult:
+        """Gives several tasks the same new description in a single transaction.
+        :param task_ids: The ID numbers of the tasks as a list of ints.
+        :param new_description: The tasks' new description as a string.
+        :return: A MutationResult listing the updated and missing task numbers.
+        """
+        return self._mutate_tasks(self.queries.UPDATE_TASKS_DESCRIPTION,
+                                  (new_description, self.backend.task_id_list(task_ids)), task_ids)
+
+    def archive_tasks(self, older_than: timedelta, batch_size: int | None = None) -> int:
+        """Moves completed tasks into tasks_archive (migration 007 on PostgreSQL), so listings, status filters, and
+        updates only work through the tasks still in use. Each batch is its own short transaction, so archiving a long
+        history never holds locks on the whole table.
+        :param older_than: Tasks whose status was set to COMPLETED at least this long ago are archived.
+        :param batch_size: The most tasks moved per transaction (Default: TASKDB_ARCHIVE_BATCH_SIZE).
+        :return: The number of tasks archived.
+        """
+        batch_size = batch_size or TASKDB_ARCHIVE_BATCH_SIZE
+        cutoff: datetime = datetime.now(timezone.utc) - older_than
+        archived_count: int = 0
+        with self.backend.connection() as connection:
+            while True:
+                with connection:
+                    with self.backend.cursor(connection) as cursor:
+                        batch_count: int = self.backend.archive_tasks(cursor, cutoff, batch_size)
+                        if batch_count:
+                            self.backend.bump_version(cursor)
+                archived_count += batch_count
+                if batch_count < batch_size:
+                    break
+        if archived_count:
+            self._invalidate_cache()
+        return archived_count
+
+    def import_tasks(self, file, file_format: str = "csv") -> int:
+        """Streams tasks from an open CSV or JSONL file into the database in one transaction (COPY ... FROM STDIN on
+        PostgreSQL). CSV files need a header row naming any of the task columns (task_id is ignored); JSONL files hold
+        one object per line with those keys. Missing dates and statuses get the same defaults as add_task.
+        :param file: A text file object positioned at the start of the data.
+        :param file_format: The file's format ('csv' or 'jsonl').
+        :return: The number of tasks imported.
+        """
+        with self.backend.connection() as connection:
+            with connection:
+                with self.backend.cursor(connection) as cursor:
+                    imported_count: int = self.backend.import_tasks(cursor, file, file_format)
+                    self.backend.bump_version(cursor)
+        self._invalidate_cache()
+        return imported_count
+
+    def export_tasks(self, file, file_format: str = "csv") -> int:
+        """Streams every task into an open file as CSV or JSONL (COPY ... TO STDOUT on PostgreSQL).
+        :param file: A writable text file object.
+        :param file_format: The file's format ('csv' or 'jsonl').
+        :return: The number of tasks exported.
+        """
+        with self.backend.connection() as connection:
+            with connection:
+                with self.backend.cursor(connection) as cursor:
+                    return self.backend.export_tasks(cursor, file, file_format)
@@ -0,0 +1,199 @@
+#!/usr/bin/python3
+"""This module contains the long-running modes that keep one warm session for many commands.
+
+`taskdb shell` reads commands interactively, and `taskdb serve` runs them for other `taskdb` processes over a Unix
+socket. Both run each command through cli.main in this process, so the database driver, the parsed .env file, the
+connection pool, and the listing cache are set up once instead of once per command.
+"""
+import io
+import json
+import os, sys
+import shlex
+import signal
+import socket
+import socketserver
+from contextlib import redirect_stderr, redirect_stdout
+from .client import default_socket_path, settings_environment
+
+# Output is sent back to the client in chunks of about this many characters.
+OUTPUT_CHUNK_SIZE: int = 64 * 1024
+
+
+def run_command_line(argv: list) -> int:
+    """Runs one command line the way the taskdb executable would, in this process.
+    :param argv: The command-line arguments.
+    :return: The command's exit code.
+    """
+    from .cli import main
+    try:
+        return main(argv, allow_forwarding=False) or 0
+    except SystemExit as exit_request:
+        if exit_request.code is None or isinstance(exit_request.code, int):
+            return exit_request.code or 0
+        print(exit_request.code, file=sys.stderr)
+        return 1
+
+
+class OutputStream(io.TextIOBase):
+    """A text stream that sends what is written to it back to a client as JSON lines, one chunk at a time."""
+
+    def __init__(self, stream_name: str, connection_file):
+        """Creates the stream.
+        :param stream_name: "stdout" or "stderr".
+        :param connection_file: The client connection's binary file.
+        """
+        self.stream_name = stream_name
+        self.connection_file = connection_file
+        self.pending: list = []
+        self.pending_size: int = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self.pending.append(text)
+        self.pending_size += len(text)
+        if self.pending_size >= OUTPUT_CHUNK_SIZE:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self.pending:
+            message: dict = {"stream": self.stream_name, "data": "".join(self.pending)}
+            self.connection_file.write(json.dumps(message).encode() + b"\n")
+            self.pending, self.pending_size = [], 0
+        self.connection_file.flush()
+
+
+class CommandHandler(socketserver.StreamRequestHandler):
+    """Runs the command line sent by one client and streams its output back."""
+
+    def handle(self):
+        try:
+            request: dict = json.loads(self.rfile.readline())
+        except ValueError:
+            return
+        client_settings: dict = request.get("settings") or {}
+        if client_settings != self.server.settings:
+            # The client would use a different database or configuration, so it runs the command itself instead.
+            mismatched: list = sorted(name for name in set(self.server.settings) | set(client_settings)
+                                      if self.server.settings.get(name) != client_settings.get(name))
+            self.wfile.write(json.dumps({"run_locally": True, "mismatched_settings": mismatched}).encode() + b"\n")
+            return
+        stdout = OutputStream("stdout", self.wfile)
+        stderr = OutputStream("stderr", self.wfile)
+        working_directory: str = os.getcwd()
+        try:
+            # Relative file names (import and export) are relative to the client's directory.
+            os.chdir(request.get("cwd") or working_directory)
+        except OSError:
+            # The daemon can't enter the client's directory (it was removed, or the daemon lacks permission), so the
+            # client runs the command itself instead.
+            self.wfile.write(json.dumps({"run_locally": True}).encode() + b"\n")
+            return
+        try:
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                exit_code: int = run_command_line(request["argv"])
+            stdout.flush()
+            stderr.flush()
+            self.wfile.write(json.dumps({"exit_code": exit_code}).encode() + b"\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            os.chdir(working_directory)
+
+
+class CommandServer(socketserver.UnixStreamServer):
+    """Serves one command at a time. Commands share this process's standard output, so they never run concurrently."""
+
+    # The daemon's database settings from its environment, before any .env file is loaded. Clients send theirs the
+    # same way, and both then read the same .env file, so equal environments mean the same database.
+    settings: dict = {}
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.server_address)
+            except OSError:
+                os.unlink(self.server_address)  # Left behind by a daemon that didn't shut down cleanly.
+            else:
+                raise OSError(f"A taskdb daemon is already listening on \"{self.server_address}\".")
+            finally:
+                probe.close()
+        old_umask: int = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(old_umask)
+
+
+def warm_up():
+    """Loads the task operations and opens a database connection, so the first command is as fast as the rest.
+    :return: None
+    """
+    from .tasks import repository
+    with repository.backend.connection():
+        pass
+
+
+def serve(socket_path: str | None = None):
+    """Runs the daemon until it is interrupted or sent SIGTERM. Other taskdb commands forward to it automatically.
+    :param socket_path: The Unix socket to listen on (Default: TASKDB_SOCKET_PATH or ~/.taskdb.sock).
+    :return: None
+    """
+    socket_path = socket_path or default_socket_path()
+    settings: dict = settings_environment()
+    try:
+        server = CommandServer(socket_path, CommandHandler)
+        server.settings = settings
+    except OSError as error:
+        print(f"Error: Could not listen on \"{socket_path}\": {error}", file=sys.stderr)
+        sys.exit(1)
+    warm_up()
+    signal.signal(signal.SIGTERM, lambda signal_number, frame: sys.exit(0))
+    print(f"taskdb daemon listening on {socket_path}. Press Ctrl+C to stop.")
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        print("taskdb daemon stopped.")
+
+
+def run_shell():
+    """Reads taskdb commands interactively (without the leading "taskdb") until "exit", "quit", or end of input.
+    :return: None
+    """
+    try:
+        import readline  # noqa: F401 (enables line editing and history for input())
+    except ImportError:
+        pass
+    warm_up()
+    print("TaskDB shell. Type a command such as \"--lall\" or \"add 'Buy milk'\", \"--help\", or \"exit\".")
+    while True:
+        try:
+            line: str = input("taskdb> ")
+        except EOFError:
+            print()
+            return
+        except KeyboardInterrupt:
+            print()
+            continue
+        try:
+            argv: list = shlex.split(line)
+        except ValueError as error:
+            print(f"Error: {error}", file=sys.stderr)
+            continue
+        if not argv:
+            continue
+        if argv[0] in ("exit", "quit"):
+            return
+        if argv[0] in ("shell", "serve"):
+            print(f"Error: \"{argv[0]}\" can't be run from inside the shell.", file=sys.stderr)
+            continue
+        run_command_line(argv)
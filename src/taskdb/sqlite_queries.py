@@ -0,0 +1,164 @@
+#!/usr/bin/python3
+"""This module contains the SQLite versions of the SQL in queries.py, plus the SQLite schema."""
+
+# SQLite has no now(); this produces the same UTC ISO-8601 text that the timestamptz converter parses back.
+NOW: str = "strftime('%Y-%m-%d %H:%M:%f+00:00', 'now')"
+
+TASK_COLUMNS: str = "task_id, task, task_status, task_date_and_time, task_status_date_and_time"
+
+ADD_TASK: str = f"INSERT INTO tasks (task, task_date_and_time, task_status) VALUES (?, {NOW}, 'NOT STARTED') " \
+                f"RETURNING {TASK_COLUMNS};"
+
+# Task numbers are passed as one JSON array so each statement stays a single cached, prepared statement.
+DELETE_TASKS: str = "DELETE FROM tasks WHERE task_id IN (SELECT value FROM json_each(?)) RETURNING task_id;"
+
+UPDATE_TASKS_STATUS: str = f"UPDATE tasks SET task_status = ?, task_status_date_and_time = {NOW} " \
+                           "WHERE task_id IN (SELECT value FROM json_each(?)) RETURNING task_id;"
+
+UPDATE_TASKS_DESCRIPTION: str = f"UPDATE tasks SET task = ?, task_date_and_time = {NOW} " \
+                                "WHERE task_id IN (SELECT value FROM json_each(?)) RETURNING task_id;"
+
+TASKS_VERSION: str = "SELECT version, (SELECT generation FROM tasks_generation) FROM tasks_version;"
+
+BUMP_TASKS_VERSION: str = "UPDATE tasks_version SET version = version + 1;"
+
+# SQLite can't feed DELETE ... RETURNING into an INSERT, so a batch is archived with two statements in one
+# transaction. Both take the cutoff timestamp and the batch size, and pick the same rows.
+ARCHIVE_BATCH: str = "SELECT task_id FROM tasks WHERE task_status = 'COMPLETED' AND task_status_date_and_time < ? " \
+                     "ORDER BY task_status_date_and_time, task_id LIMIT ?"
+ARCHIVE_TASKS: str = f"INSERT INTO tasks_archive ({TASK_COLUMNS}) SELECT {TASK_COLUMNS} FROM tasks " \
+                     f"WHERE task_id IN ({ARCHIVE_BATCH});"
+DELETE_ARCHIVED_TASKS: str = f"DELETE FROM tasks WHERE task_id IN ({ARCHIVE_BATCH});"
+
+# The labels of the age buckets in TASK_STATS, in bucket order.
+AGE_BUCKETS: tuple = ("Under 1 day", "1-7 days", "1-4 weeks", "1-3 months", "Over 3 months")
+
+# SQLite has no GROUPING SETS, so the three groupings are combined with UNION ALL into one statement. Each row is
+# (statistic, key, count). The parameter is how many whole weeks before the current one to count completions for.
+# 'weekday 1' after '-6 days' gives the Monday that starts a date's week, like date_trunc('week', ...).
+TASK_STATS: str = \
+    "SELECT 'status', task_status, count(*) FROM tasks GROUP BY task_status " \
+    "UNION ALL SELECT 'age', CASE " \
+    "WHEN julianday('now') - julianday(task_date_and_time) < 1 THEN 0 " \
+    "WHEN julianday('now') - julianday(task_date_and_time) < 7 THEN 1 " \
+    "WHEN julianday('now') - julianday(task_date_and_time) < 30 THEN 2 " \
+    "WHEN julianday('now') - julianday(task_date_and_time) < 90 THEN 3 ELSE 4 END AS age_bucket, count(*) " \
+    "FROM tasks WHERE task_status IS NOT 'COMPLETED' AND task_date_and_time IS NOT NULL GROUP BY age_bucket " \
+    "UNION ALL SELECT 'week', date(task_status_date_and_time, '-6 days', 'weekday 1') AS completed_week, count(*) " \
+    "FROM tasks WHERE task_status = 'COMPLETED' " \
+    "AND task_status_date_and_time >= date('now', '-6 days', 'weekday 1', printf('-%d days', ? * 7)) GROUP BY completed_week;"
+
+IMPORT_TASK: str = "INSERT INTO tasks (task, task_status, task_date_and_time, task_status_date_and_time) " \
+                   f"VALUES (?, ?, COALESCE(?, {NOW}), ?);"
+
+EXPORT_TASKS: str = f"SELECT {TASK_COLUMNS} FROM tasks ORDER BY task_id;"
+
+# The same tables, indexes, tasks_version counter, and tasks_archive table as schema.sql and the PostgreSQL migrations.
+SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task text NOT NULL,
+    task_status text NULL,
+    task_date_and_time timestamptz NULL,
+    task_status_date_and_time timestamptz NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_task_status_task_id_idx ON tasks (task_status, task_id);
+CREATE INDEX IF NOT EXISTS tasks_task_date_and_time_idx ON tasks (task_date_and_time);
+
+CREATE TABLE IF NOT EXISTS tasks_version (
+    singleton INTEGER PRIMARY KEY CHECK (singleton = 1),
+    version INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO tasks_version (singleton, version) VALUES (1, 0);
+-- A random id for this database file. It lives in its own table, so database files created before it get one too.
+CREATE TABLE IF NOT EXISTS tasks_generation (generation text NOT NULL);
+INSERT INTO tasks_generation (generation) SELECT lower(hex(randomblob(16)))
+    WHERE NOT EXISTS (SELECT 1 FROM tasks_generation);
+-- SQLite only has row-level triggers, which would rewrite tasks_version once per imported or changed row. The backend
+-- bumps it once per operation instead (BUMP_TASKS_VERSION), like the statement-level trigger of migration 004.
+DROP TRIGGER IF EXISTS tasks_version_after_insert;
+DROP TRIGGER IF EXISTS tasks_version_after_update;
+DROP TRIGGER IF EXISTS tasks_version_after_delete;
+
+CREATE TABLE IF NOT EXISTS tasks_archive (
+    task_id INTEGER PRIMARY KEY,
+    task text NOT NULL,
+    task_status text NULL,
+    task_date_and_time timestamptz NULL,
+    task_status_date_and_time timestamptz NULL,
+    archived_at timestamptz NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f+00:00', 'now'))
+);
+CREATE INDEX IF NOT EXISTS tasks_completed_status_date_idx ON tasks (task_status_date_and_time)
+    WHERE task_status = 'COMPLETED';
+"""
+
+
+def build_list_query(status_filter: str | None = None, limit: int | None = None, offset: int | None = None,
+                     after_id: int | None = None, include_archive: bool = False) -> tuple:
+    """Builds the SELECT used to list tasks.
+    :param status_filter: An optional status ('NOT STARTED', 'STARTED', or 'COMPLETED') for filtering.
+    :param limit: An optional maximum number of tasks to list.
+    :param offset: An optional number of matching tasks to skip before listing.
+    :param after_id: An optional task number; only tasks with a higher number are listed (keyset pagination).
+    :param include_archive: Also list the tasks moved to tasks_archive, in task number order with the rest.
+    :return: A tuple of the query string and its list of parameters.
+    """
+    query = f"SELECT {TASK_COLUMNS} FROM tasks"
+    if include_archive:
+        query = f"SELECT {TASK_COLUMNS} FROM (SELECT {TASK_COLUMNS} FROM tasks " \
+                f"UNION ALL SELECT {TASK_COLUMNS} FROM tasks_archive) AS all_tasks"
+    conditions = []
+    parameters = []
+
+    if status_filter:
+        conditions.append("task_status = ?")
+        parameters.append(status_filter)
+    if after_id is not None:
+        conditions.append("task_id > ?")
+        parameters.append(after_id)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+
+    query += " ORDER BY task_id"
+
+    # SQLite only accepts OFFSET after a LIMIT; -1 means no limit.
+    if limit is not None or offset is not None:
+        query += " LIMIT ?"
+        parameters.append(limit if limit is not None else -1)
+    if offset is not None:
+        query += " OFFSET ?"
+        parameters.append(offset)
+
+    return query, parameters
+
+
+def build_search_query(terms: str, status_filter: str | None = None, limit: int | None = None,
+                       fuzzy: bool = False) -> tuple:
+    """Builds the SELECT used to search task descriptions. SQLite has no tsvector, so every term must appear somewhere
+    in the description (case-insensitively) and results are listed in task order.
+    :param terms: The search terms, separated by spaces.
+    :param status_filter: An optional status ('NOT STARTED', 'STARTED', or 'COMPLETED') for filtering.
+    :param limit: An optional maximum number of tasks to return.
+    :param fuzzy: Ignored; SQLite has no trigram matching.
+    :return: A tuple of the query string and its list of parameters.
+    """
+    query = f"SELECT {TASK_COLUMNS} FROM tasks"
+    conditions = []
+    parameters = []
+
+    for term in terms.split():
+        conditions.append("instr(lower(task), lower(?)) > 0")
+        parameters.append(term.strip('"'))
+    if status_filter:
+        conditions.append("task_status = ?")
+        parameters.append(status_filter)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+
+    query += " ORDER BY task_id"
+
+    if limit is not None:
+        query += " LIMIT ?"
+        parameters.append(limit)
+
+    return query, parameters
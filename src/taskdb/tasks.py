@@ -0,0 +1,367 @@
+#!/usr/bin/python3
+"""This module contains the task operations used by the CLI. They print their results on top of TaskRepository."""
+import json
+import os, sys
+import time
+from . import instrumentation
+from .backends import UnsupportedOperationError
+from .cache import TaskCache
+from .render import render_tasks
+from .repository import TaskRepository
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+def get_db_connection():
+    """Establishes a new, unpooled database connection. Task operations use pool.borrow_connection() instead.
+    :return: A new database connection.
+    """
+    import psycopg2
+    try:
+        connection = psycopg2.connect(
+            dbname=os.getenv("TASKDB_NAME"),
+            user=os.getenv("TASKDB_USER"),
+            password=os.getenv("TASKDB_PASSWORD"),
+            host=os.getenv("TASKDB_HOST"),
+            port=os.getenv("TASKDB_PORT")
+        )
+        return connection
+    except psycopg2.OperationalError as error:
+        print(f"Error: Could not connect to the database. Have you run the setup script in database.py?",
+              file=sys.stderr)
+        print(f"Details: {error}", file=sys.stderr)
+        sys.exit(1)
+
+
+# The repository shared by every CLI operation. It borrows connections from the pool as needed, and reads listings
+# through an on-disk cache when TASKDB_CACHE_PATH is set.
+repository = TaskRepository(cache=TaskCache.from_environment())
+
+
+def list_tasks(status_filter: str | None = None, limit: int | None = None, offset: int | None = None,
+               after_id: int | None = None, itersize: int | None = None, output_format: str = "text",
+               include_archive: bool = False):
+    """Lists tasks from the database, streaming rows through a server-side cursor so output starts immediately.
+    :param status_filter: An optional status ('NOT STARTED', 'STARTED', or 'COMPLETED') for filtering.
+    :param limit: An optional maximum number of tasks to list.
+    :param offset: An optional number of matching tasks to skip before listing.
+    :param after_id: An optional task number; only tasks with a higher number are listed (keyset pagination).
+    :param itersize: An optional number of rows fetched per round trip (Default: TASKDB_LIST_ITERSIZE).
+    :param output_format: 'text' (Default), 'tsv', 'json', or 'table'.
+    :param include_archive: Also list the tasks moved to the archive by archive_tasks.
+    """
+    try:
+        with instrumentation.span("render"):
+            task_count: int = render_tasks(repository.iter_tasks(status_filter, limit, offset, after_id, itersize,
+                                                                 include_archive), output_format)
+        if not task_count and output_format in ("text", "table"):
+            print("No tasks found matching that criteria.")
+    except repository.backend.Error as error:
+        print(f"Error listing tasks: {error}.", file=sys.stderr)
+        if include_archive and repository.backend.name == "postgresql":
+            print("--include-archive needs migration 007. Run `taskdb migrate` to apply it.", file=sys.stderr)
+
+
+def search_tasks(terms: str, status_filter: str | None = None, limit: int | None = None, fuzzy: bool = False,
+                 output_format: str = "text"):
+    """Prints the tasks whose descriptions match the search terms, best matches first.
+    :param terms: The search terms.
+    :param status_filter: An optional status ('NOT STARTED', 'STARTED', or 'COMPLETED') for filtering.
+    :param limit: An optional maximum number of tasks to list.
+    :param fuzzy: Also match descriptions that only resemble the terms.
+    :param output_format: 'text' (Default), 'tsv', 'json', or 'table'.
+    """
+    try:
+        with instrumentation.span("render"):
+            task_count: int = render_tasks(repository.search_tasks(terms, status_filter, limit, fuzzy), output_format)
+        if not task_count and output_format in ("text", "table"):
+            print("No tasks found matching that criteria.")
+    except repository.backend.Error as error:
+        print(f"Error searching tasks: {error}.", file=sys.stderr)
+        if repository.backend.name == "postgresql":
+            print("Search needs migration 005 (and the pg_trgm extension for --fuzzy). Run `taskdb migrate` to "
+                  "apply it.", file=sys.stderr)
+
+
+def add_task(description: str) -> str | None:
+    """Adds a task, along with the current date and time of the end user's computer, to the database.
+    :param description: A string of the task's description.
+    :return: A string showing the task added to the database successfully, or None.
+    """
+    try:
+        repository.add_task(description)
+        print(f"Task \"{description}\" successfully added to the database!")
+    except repository.backend.Error as error:
+        print(f"Error adding {description} to the database: {error}.", file=sys.stderr)
+
+
+def compress_task_ids(task_ids: list) -> str:
+    """Formats task numbers as comma-separated numbers and ranges, such as "1-5, 9, 12-20".
+    :param task_ids: The task numbers as a list of ints.
+    :return: The compressed string, in ascending order.
+    """
+    ranges: list = []
+    for task_id in sorted(task_ids):
+        if ranges and task_id == ranges[-1][1] + 1:
+            ranges[-1][1] = task_id
+        else:
+            ranges.append([task_id, task_id])
+    return ", ".join(str(first) if first == last else f"{first}-{last}" for first, last in ranges)
+
+
+def report_missing_tasks(task_ids: list, found_task_ids: set) -> list:
+    """Prints one error listing the requested task numbers that the database did not return, with runs of
+    consecutive numbers shown as ranges.
+    :param task_ids: The task numbers that were requested.
+    :param found_task_ids: The task numbers the statement's RETURNING clause reported.
+    :return: A list of the task numbers that were not found.
+    """
+    missing_task_ids: list = [task_id for task_id in task_ids if task_id not in found_task_ids]
+    if len(missing_task_ids) == 1:
+        print(f"Error: No task found with number \"{missing_task_ids[0]}\".")
+    elif missing_task_ids:
+        print(f"Error: No tasks found with numbers {compress_task_ids(missing_task_ids)} "
+              f"({len(missing_task_ids)} in total).")
+    return missing_task_ids
+
+
+def delete_tasks(task_ids: list) -> list | None:
+    """Deletes several tasks from the database with one statement in a single transaction.
+    :param task_ids: The ID numbers of the tasks as a list of ints.
+    :return: A list of the task numbers deleted from the database, or None.
+    """
+    try:
+        found_task_ids: set = set(repository.delete_tasks(task_ids).found_task_ids)
+        for task_id in task_ids:
+            if task_id in found_task_ids:
+                print(f"Task \"{task_id}\" successfully deleted from the database!")
+        report_missing_tasks(task_ids, found_task_ids)
+        return sorted(found_task_ids)
+    except repository.backend.Error as error:
+        print(f"Error deleting task numbers {format_task_ids(task_ids)} from the database: {error}.",
+              file=sys.stderr)
+
+
+def delete_task(task_id: int) -> str | None:
+    """Deletes a task from the database.
+    :param task_id: The ID number of the task as an int.
+    :return: A string showing the task deleted from the database successfully, or None.
+    """
+    delete_tasks([task_id])
+
+
+def add_tasks_status(task_ids: list, task_status: str) -> list | None:
+    """Adds the same status, along with the current date and time, to several tasks in a single transaction.
+    :param task_ids: The ID numbers of the tasks as a list of ints.
+    :param task_status: The tasks' status (NOT STARTED, STARTED, or COMPLETED)
+    :return: A list of the task numbers whose status changed, or None.
+    """
+    try:
+        found_task_ids: set = set(repository.add_tasks_status(task_ids, task_status).found_task_ids)
+        for task_id in task_ids:
+            if task_id in found_task_ids:
+                print(f"Successfully added a status to task number \"{task_id}\" to {task_status.upper()}")
+        report_missing_tasks(task_ids, found_task_ids)
+        return sorted(found_task_ids)
+    except repository.backend.Error as error:
+        print(f"Error adding a status to task numbers {format_task_ids(task_ids)}: {error}.", file=sys.stderr)
+
+
+def add_task_status(task_id: int, task_status: str) -> str | None:
+    """Adds the status, along with the current date and time of the end user's computer, to a task via its ID.
+    :param task_id: The ID number of the task as an int.
+    :param task_status: The task's status (NOT STARTED, STARTED, or COMPLETED)
+    :return: A string showing the task deleted from the database successfully, or None.
+    """
+    add_tasks_status([task_id], task_status)
+
+
+def update_tasks_description(task_ids: list, new_description: str) -> list | None:
+    """Gives several tasks the same new description in a single transaction.
+    :param task_ids: The ID numbers of the tasks as a list of ints.
+    :param new_description: The tasks' new description as a string.
+    :return: A list of the task numbers updated, or None.
+    """
+    try:
+        found_task_ids: set = set(repository.update_tasks_description(task_ids, new_description).found_task_ids)
+        for task_id in task_ids:
+            if task_id in found_task_ids:
+                print(f"Successfully updated task number {task_id} to \"{new_description}\"")
+        report_missing_tasks(task_ids, found_task_ids)
+        return sorted(found_task_ids)
+    except repository.backend.Error as error:
+        print(f"Error updating task numbers {format_task_ids(task_ids)}: {error}.", file=sys.stderr)
+
+
+def update_task_description(task_id: int, new_description: str) -> str | None:
+    """Updates the task's description via its ID.
+    :param task_id: The ID number of the task as an int.
+    :param new_description: The task's new description as a string.
+    :return: A string showing the task deleted from the database successfully, or None.
+    """
+    update_tasks_description([task_id], new_description)
+
+
+def format_task_ids(task_ids: list) -> str:
+    """Formats task numbers for error messages without printing thousands of them.
+    :param task_ids: The task numbers as a list of ints.
+    :return: A short, comma-separated string of task numbers.
+    """
+    shown: str = ", ".join(str(task_id) for task_id in task_ids[:10])
+    return shown if len(task_ids) <= 10 else f"{shown}, ... ({len(task_ids)} in total)"
+
+
+def detect_file_format(file_path: str, file_format: str | None = None) -> str:
+    """Works out whether a file is CSV or JSONL.
+    :param file_path: The pathname of the file to import or export.
+    :param file_format: An explicit format ('csv' or 'jsonl') that overrides the file extension.
+    :return: Either 'csv' or 'jsonl'.
+    """
+    if file_format:
+        return file_format
+    return "jsonl" if file_path.lower().endswith((".jsonl", ".json", ".ndjson")) else "csv"
+
+
+def archive_tasks(older_than, batch_size: int | None = None) -> int | None:
+    """Moves completed tasks into the archive in batches, so the tasks table only holds the tasks still in use.
+    :param older_than: A timedelta; tasks completed at least this long ago are archived.
+    :param batch_size: An optional number of tasks moved per transaction (Default: TASKDB_ARCHIVE_BATCH_SIZE).
+    :return: The number of tasks archived, or None.
+    """
+    try:
+        archived_count: int = repository.archive_tasks(older_than, batch_size)
+        print(f"Archived {archived_count} completed task{'' if archived_count == 1 else 's'}.")
+        return archived_count
+    except repository.backend.Error as error:
+        print(f"Error archiving tasks: {error}.", file=sys.stderr)
+        if repository.backend.name == "postgresql":
+            print("Archiving needs migration 007. Run `taskdb migrate` to apply it.", file=sys.stderr)
+
+
+def import_tasks(file_path: str, file_format: str | None = None) -> int | None:
+    """Streams tasks from a CSV or JSONL file into the database with COPY ... FROM STDIN and reports the rate.
+    :param file_path: The pathname of the file to import.
+    :param file_format: An optional format ('csv' or 'jsonl'); otherwise inferred from the file extension.
+    :return: The number of tasks imported, or None.
+    """
+    file_format = detect_file_format(file_path, file_format)
+    start_time: float = time.perf_counter()
+    try:
+        with open(file_path, "r", newline="", encoding="utf-8") as file:
+            imported_count: int = repository.import_tasks(file, file_format)
+        elapsed_time: float = time.perf_counter() - start_time
+        rows_per_second: float = imported_count / elapsed_time if elapsed_time else float(imported_count)
+        print(f"Imported {imported_count} tasks from \"{file_path}\" in {elapsed_time:.2f}s "
+              f"({rows_per_second:,.0f} rows/s).")
+        return imported_count
+    except FileNotFoundError:
+        print(f"Error: File \"{file_path}\" not found.", file=sys.stderr)
+    except ValueError as error:
+        print(f"Error: \"{file_path}\": {error}.", file=sys.stderr)
+    except repository.backend.Error as error:
+        print(f"Error importing tasks from \"{file_path}\": {error}.", file=sys.stderr)
+
+
+def export_tasks(file_path: str, file_format: str | None = None) -> int | None:
+    """Streams every task into a CSV or JSONL file with COPY ... TO STDOUT and reports the rate.
+    :param file_path: The pathname of the file to write.
+    :param file_format: An optional format ('csv' or 'jsonl'); otherwise inferred from the file extension.
+    :return: The number of tasks exported, or None.
+    """
+    file_format = detect_file_format(file_path, file_format)
+    start_time: float = time.perf_counter()
+    try:
+        with open(file_path, "w", newline="", encoding="utf-8") as file:
+            exported_count: int = repository.export_tasks(file, file_format)
+        elapsed_time: float = time.perf_counter() - start_time
+        rows_per_second: float = exported_count / elapsed_time if elapsed_time else float(exported_count)
+        print(f"Exported {exported_count} tasks to \"{file_path}\" in {elapsed_time:.2f}s "
+              f"({rows_per_second:,.0f} rows/s).")
+        return exported_count
+    except OSError as error:
+        print(f"Error: Could not write \"{file_path}\": {error}.", file=sys.stderr)
+    except repository.backend.Error as error:
+        print(f"Error exporting tasks to \"{file_path}\": {error}.", file=sys.stderr)
+
+
+def show_stats(weeks: int = 8):
+    """Prints how many tasks are in each status, how old the open tasks are, and how many were completed each week.
+    :param weeks: The number of weeks of completions to show, counting the current one.
+    :return: None
+    """
+    try:
+        stats = repository.get_stats(weeks)
+    except repository.backend.Error as error:
+        print(f"Error computing task stats: {error}.", file=sys.stderr)
+        return
+
+    print("Tasks by status:")
+    for task_status, task_count in sorted(stats.status_counts.items(), key=lambda item: item[0] or ""):
+        print(f"  {task_status or 'No status':<16}{task_count:>8}")
+    print(f"  {'Total':<16}{stats.total:>8}")
+
+    print("Open tasks by age (since added):")
+    largest_bucket: int = max(stats.age_histogram.values(), default=0)
+    for bucket, task_count in stats.age_histogram.items():
+        bar: str = "#" * round(30 * task_count / largest_bucket) if largest_bucket else ""
+        print(f"  {bucket:<16}{task_count:>8}  {bar}".rstrip())
+
+    print(f"Tasks completed per week (last {weeks} weeks):")
+    for week_start, task_count in stats.completions_per_week:
+        print(f"  Week of {week_start.strftime('%m/%d/%Y')}{task_count:>8}")
+
+
+def format_change(change, output_format: str = "text") -> str:
+    """Formats one change from the change feed.
+    :param change: A TaskChange record.
+    :param output_format: 'json' for a JSON object, anything else for a line of text.
+    :return: The change as one line, without a line break.
+    """
+    if output_format == "json":
+        return json.dumps(change._asdict())
+    if change.task_id is None:
+        return f"{change.operation.capitalize()}: {change.count} tasks"
+    return f"{change.operation.capitalize()}: Task # {change.task_id} | " \
+           f"Task Status: {change.task_status or 'Not Started'}"
+
+
+def watch_tasks(status_filter: str | None = None, output_format: str = "text"):
+    """Prints each task change as it is committed, until interrupted with Ctrl+C.
+    :param status_filter: An optional status ('NOT STARTED', 'STARTED', or 'COMPLETED') for filtering.
+    :param output_format: 'json' for JSON Lines, anything else for lines of text.
+    :return: None
+    """
+    try:
+        for change in repository.watch_changes(status_filter):
+            print(format_change(change, output_format), flush=True)
+    except KeyboardInterrupt:
+        pass
+    except UnsupportedOperationError as error:
+        print(f"Error: {error}", file=sys.stderr)
+    except repository.backend.Error as error:
+        print(f"Error watching tasks: {error}.", file=sys.stderr)
+
+
+def show_cache_stats():
+    """Prints the listing cache's hit and miss counters.
+    :return: None
+    """
+    if repository.cache is None:
+        print("The listing cache is off. Set TASKDB_CACHE_PATH to a directory to turn it on.")
+        return
+    stats: dict = repository.cache.stats()
+    print(f"Cache hits: {stats['hits']} | Cache misses: {stats['misses']} | Hit ratio: {stats['hit_ratio']:.1%} | "
+          f"Cached listings: {stats['entries']}")
+
+
+def clear_cache():
+    """Empties the listing cache and resets its counters.
+    :return: None
+    """
+    if repository.cache is None:
+        print("The listing cache is off. Set TASKDB_CACHE_PATH to a directory to turn it on.")
+        return
+    repository.cache.clear()
+    print("Listing cache cleared.")
@@ -0,0 +1,16 @@
+"""This module contains the shared fixtures for the tests, which run against the SQLite backend."""
+import pytest
+from taskdb.backends import SQLiteBackend
+from taskdb.repository import TaskRepository
+
+
+@pytest.fixture
+def backend(tmp_path):
+    """A SQLite backend on a fresh database file."""
+    return SQLiteBackend(str(tmp_path / "tasks.db"))
+
+
+@pytest.fixture
+def repository(backend):
+    """A repository without a cache on the fresh database."""
+    return TaskRepository(backend)
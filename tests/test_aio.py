@@ -0,0 +1,34 @@
+"""This module contains the tests for the asyncio API's connection pool handling."""
+import asyncio
+import pytest
+
+aio = pytest.importorskip("taskdb.aio")
+
+
+def test_each_event_loop_gets_its_own_pool(tmp_path, monkeypatch):
+    # No server is needed: the pool opens without waiting for its first connection.
+    monkeypatch.setenv("TASKDB_HOST", str(tmp_path))
+    monkeypatch.setenv("TASKDB_POOL_MIN_SIZE", "0")
+
+    async def open_and_close_pool():
+        async_pool = await aio.get_async_pool()
+        assert await aio.get_async_pool() is async_pool
+        await aio.close_async_pool()
+        return async_pool
+
+    first_pool = asyncio.run(open_and_close_pool())
+    second_pool = asyncio.run(open_and_close_pool())
+    assert first_pool is not second_pool
+
+
+def test_a_closed_loop_does_not_break_the_next_one(tmp_path, monkeypatch):
+    monkeypatch.setenv("TASKDB_HOST", str(tmp_path))
+    monkeypatch.setenv("TASKDB_POOL_MIN_SIZE", "0")
+    asyncio.run(aio.get_async_pool())  # The first loop closes without closing its pool.
+
+    async def reopen_pool():
+        async_pool = await aio.get_async_pool()
+        await aio.close_async_pool()
+        return async_pool.closed
+
+    assert asyncio.run(reopen_pool())
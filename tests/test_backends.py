@@ -0,0 +1,18 @@
+"""This module contains the tests for the storage backends' module-level behavior."""
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from taskdb.backends import UnsupportedOperationError
+
+SOURCE_DIRECTORY: Path = Path(__file__).resolve().parent.parent / "src"
+
+
+def test_importing_backends_does_not_load_sqlite3():
+    check: str = "import sys, taskdb.backends; sys.exit('sqlite3' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", check], cwd=SOURCE_DIRECTORY).returncode == 0
+
+
+def test_sqlite_backend_reports_watching_as_unsupported(backend):
+    with pytest.raises(UnsupportedOperationError):
+        backend.iter_changes()
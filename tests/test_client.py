@@ -0,0 +1,50 @@
+"""This module contains the tests for forwarding commands to a `taskdb serve` daemon."""
+import json
+import socket
+import threading
+import pytest
+from taskdb import client
+from taskdb.server import CommandHandler, CommandServer
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    """A daemon listening on a temporary socket, with its own database settings."""
+    server = CommandServer(str(tmp_path / "taskdb.sock"), CommandHandler)
+    server.settings = {"TASKDB_BACKEND": "sqlite", "TASKDB_SQLITE_PATH": str(tmp_path / "daemon.db")}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_settings_environment_skips_client_only_and_unrelated_variables():
+    environment: dict = {"TASKDB_NAME": "tasks", "PGHOST": "db", "DEFAULT_DB_USER": "postgres",
+                         "TASKDB_SOCKET_PATH": "/tmp/taskdb.sock", "TASKDB_NO_DAEMON": "1", "HOME": "/root"}
+    assert client.settings_environment(environment) == {"TASKDB_NAME": "tasks", "PGHOST": "db",
+                                                        "DEFAULT_DB_USER": "postgres"}
+
+
+def test_forward_runs_locally_when_the_daemon_uses_another_database(daemon, tmp_path, monkeypatch):
+    for name in client.settings_environment():
+        monkeypatch.delenv(name)
+    monkeypatch.setenv("TASKDB_BACKEND", "sqlite")
+    monkeypatch.setenv("TASKDB_SQLITE_PATH", str(tmp_path / "mine.db"))
+    assert client.forward(["add", "mine"], daemon.server_address) is None
+    assert not (tmp_path / "daemon.db").exists()
+
+
+def test_forward_returns_none_without_a_daemon(tmp_path):
+    assert client.forward(["--lall"], str(tmp_path / "missing.sock")) is None
+
+
+def test_daemon_asks_to_run_locally_when_it_cannot_enter_the_client_directory(daemon, tmp_path):
+    request: dict = {"argv": ["--lall"], "cwd": str(tmp_path / "removed"), "settings": daemon.settings}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(daemon.server_address)
+        with connection.makefile("rwb") as stream:
+            stream.write(json.dumps(request).encode() + b"\n")
+            stream.flush()
+            assert json.loads(stream.readline()) == {"run_locally": True}
+    assert not (tmp_path / "daemon.db").exists()
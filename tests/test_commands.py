@@ -0,0 +1,65 @@
+"""This module contains the tests for the command-line argument parsers."""
+import argparse
+from datetime import timedelta
+import pytest
+from taskdb.commands import MAX_TASK_IDS, build_parser, parse_interval, parse_task_ids
+
+
+def test_parse_task_ids_accepts_lists_and_ranges():
+    assert parse_task_ids("1,5,10-12") == [1, 5, 10, 11, 12]
+
+
+def test_parse_task_ids_drops_duplicates_in_order():
+    assert parse_task_ids("3, 1 1-3") == [3, 1, 2]
+
+
+@pytest.mark.parametrize("value", ["a", "1-", "5-3", "1.5"])
+def test_parse_task_ids_rejects_malformed_values(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_task_ids(value)
+
+
+def test_parse_task_ids_caps_range_size():
+    assert len(parse_task_ids(f"1-{MAX_TASK_IDS}")) == MAX_TASK_IDS
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_task_ids("1-100000000")
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_task_ids(f"1-{MAX_TASK_IDS},{MAX_TASK_IDS + 1}")
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("90d", timedelta(days=90)),
+    ("12 weeks", timedelta(weeks=12)),
+    ("6m", timedelta(days=180)),
+    ("1 Year", timedelta(days=365)),
+])
+def test_parse_interval(value, expected):
+    assert parse_interval(value) == expected
+
+
+@pytest.mark.parametrize("value", ["", "d", "3 fortnights", "-5d"])
+def test_parse_interval_rejects_malformed_values(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_interval(value)
+
+
+def test_parser_reads_archive_options():
+    args = build_parser().parse_args(["archive", "--older-than=30d", "--batch-size=10"])
+    assert (args.command_name, args.older_than, args.batch_size) == ("archive", timedelta(days=30), 10)
+
+
+@pytest.mark.parametrize("argv, expected", [
+    (["watch"], "text"),
+    (["--format=json", "watch"], "json"),
+    (["watch", "--status=completed", "--format=json"], "json"),
+    (["search", "invoice", "--format=tsv"], "tsv"),
+    (["--format=table", "search", "invoice"], "table"),
+    (["--format=tsv", "--lall"], "tsv"),
+])
+def test_format_is_accepted_before_or_after_the_command(argv, expected):
+    assert build_parser().parse_args(argv).output_format == expected
+
+
+def test_watch_only_accepts_formats_it_can_print():
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(["watch", "--format=table"])
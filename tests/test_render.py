@@ -0,0 +1,57 @@
+"""This module contains the tests for the listing renderers."""
+import io
+import json
+from datetime import datetime, timezone
+from taskdb.records import Task
+from taskdb.render import render_tasks
+
+TASKS: list = [
+    Task(1, "Buy milk", "STARTED", datetime(2024, 3, 1, 9, 30, tzinfo=timezone.utc), None),
+    Task(2, "Tab\there \"quoted\"", None, datetime(2024, 3, 2, tzinfo=timezone.utc),
+         datetime(2024, 3, 5, tzinfo=timezone.utc)),
+]
+
+
+def render(output_format: str, tasks: list = TASKS) -> tuple:
+    output = io.StringIO()
+    task_count: int = render_tasks(iter(tasks), output_format, output)
+    return task_count, output.getvalue()
+
+
+def test_text_format():
+    task_count, text = render("text")
+    assert task_count == 2
+    assert text.splitlines() == [
+        "Task # 1 | Buy milk | Task Status: STARTED | Task Added On: 03/01/2024 | Task Modified On: Never",
+        "Task # 2 | Tab\there \"quoted\" | Task Status: Not Started | Task Added On: 03/02/2024 | "
+        "Task Modified On: 03/05/2024",
+    ]
+
+
+def test_tsv_format_escapes_tabs():
+    _, text = render("tsv")
+    lines: list = text.splitlines()
+    assert lines[0] == "task_id\ttask\ttask_status\ttask_date_and_time\ttask_status_date_and_time"
+    assert lines[1].split("\t") == ["1", "Buy milk", "STARTED", "2024-03-01T09:30:00+00:00", ""]
+    assert lines[2].split("\t")[1] == "Tab\\there \"quoted\""
+
+
+def test_json_format_matches_json_dumps():
+    _, text = render("json")
+    documents: list = [json.loads(line) for line in text.splitlines()]
+    assert documents[0] == {"task_id": 1, "task": "Buy milk", "task_status": "STARTED",
+                            "task_date_and_time": "2024-03-01T09:30:00+00:00", "task_status_date_and_time": None}
+    assert documents[1]["task"] == "Tab\there \"quoted\""
+    assert documents[1]["task_status"] is None
+
+
+def test_table_format_aligns_columns_without_trailing_spaces():
+    _, text = render("table")
+    lines: list = text.splitlines()
+    assert lines[0].startswith("ID | Task")
+    assert len({line.index("|") for line in lines if "|" in line}) == 1
+    assert all(line == line.rstrip() for line in lines)
+
+
+def test_empty_listing_prints_nothing():
+    assert render("text", []) == (0, "")
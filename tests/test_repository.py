@@ -0,0 +1,166 @@
+"""This module contains the tests for TaskRepository on the SQLite backend."""
+import io
+import json
+from datetime import timedelta
+from taskdb.backends import SQLiteBackend
+from taskdb.cache import TaskCache
+from taskdb.repository import TaskRepository
+
+
+def complete_long_ago(backend, task_ids: list):
+    """Marks tasks as completed in 2020, bypassing the repository."""
+    with backend.connection() as connection:
+        with connection:
+            connection.execute("UPDATE tasks SET task_status = 'COMPLETED', "
+                               "task_status_date_and_time = '2020-01-01 00:00:00.000+00:00' "
+                               f"WHERE task_id IN ({', '.join(map(str, task_ids))});")
+
+
+def test_mutations_report_found_and_missing_tasks(repository):
+    for description in ("a", "b", "c"):
+        repository.add_task(description)
+    result = repository.add_tasks_status([1, 2, 9], "started")
+    assert (result.found_task_ids, result.missing_task_ids) == ([1, 2], [9])
+    assert [task.task_status for task in repository.list_tasks()] == ["STARTED", "STARTED", "NOT STARTED"]
+    assert repository.delete_tasks([3]).found_task_ids == [3]
+    assert [task.task_id for task in repository.list_tasks()] == [1, 2]
+
+
+def test_cache_serves_listings_until_tasks_change(backend):
+    repository = TaskRepository(backend, cache=TaskCache())
+    repository.add_task("first")
+    assert [task.task for task in repository.list_tasks()] == ["first"]
+    assert [task.task for task in repository.list_tasks()] == ["first"]
+    assert repository.cache.stats()["hits"] == 1
+
+    repository.add_task("second")
+    assert [task.task for task in repository.list_tasks()] == ["first", "second"]
+
+
+def test_cache_notices_changes_made_by_another_process(backend, tmp_path):
+    repository = TaskRepository(backend, cache=TaskCache())
+    repository.add_task("first")
+    repository.list_tasks()
+    TaskRepository(SQLiteBackend(backend.database_path)).add_task("second")
+    assert [task.task for task in repository.list_tasks()] == ["first", "second"]
+
+
+def test_cache_directory_is_not_shared_between_databases(tmp_path):
+    cache_directory: str = str(tmp_path / "cache")
+    work = TaskRepository(SQLiteBackend(str(tmp_path / "work.db")), cache=TaskCache(cache_directory=cache_directory))
+    work.add_task("WORK secret")
+    work.list_tasks()
+    work.cache.save()
+
+    home = TaskRepository(SQLiteBackend(str(tmp_path / "home.db")), cache=TaskCache(cache_directory=cache_directory))
+    home.add_task("home")
+    assert [task.task for task in home.list_tasks()] == ["home"]
+
+
+def test_cache_directory_is_not_used_for_a_recreated_database(tmp_path):
+    cache_directory: str = str(tmp_path / "cache")
+    database_path: str = str(tmp_path / "tasks.db")
+    old = TaskRepository(SQLiteBackend(database_path), cache=TaskCache(cache_directory=cache_directory))
+    old.add_task("old")
+    old.list_tasks()
+    old.cache.save()
+
+    (tmp_path / "tasks.db").unlink()
+    new = TaskRepository(SQLiteBackend(database_path), cache=TaskCache(cache_directory=cache_directory))
+    new.add_task("new")
+    assert [task.task for task in new.list_tasks()] == ["new"]
+
+
+def test_cache_directory_serves_listings_to_later_runs(backend, tmp_path):
+    cache_directory: str = str(tmp_path / "cache")
+    first = TaskRepository(backend, cache=TaskCache(cache_directory=cache_directory))
+    first.add_task("first")
+    first.list_tasks()
+    first.cache.save()
+
+    later = TaskRepository(backend, cache=TaskCache(cache_directory=cache_directory))
+    assert [task.task for task in later.list_tasks()] == ["first"]
+    assert later.cache.stats()["hits"] == 1
+    assert later.cache.stats()["misses"] == 1
+
+
+def test_cache_only_writes_the_listings_that_changed(backend, tmp_path):
+    cache_directory = tmp_path / "cache"
+    first = TaskRepository(backend, cache=TaskCache(cache_directory=str(cache_directory)))
+    first.add_task("first")
+    first.list_tasks()
+    first.list_tasks("COMPLETED")
+    first.cache.save()
+    listing_files: dict = {path.name: path.stat().st_mtime_ns for path in cache_directory.glob("*.json")
+                           if path.name != "stats.json"}
+    assert len(listing_files) == 2
+
+    later = TaskRepository(backend, cache=TaskCache(cache_directory=str(cache_directory)))
+    later.list_tasks()
+    later.list_tasks("STARTED")
+    later.cache.save()
+    written: dict = {path.name: path.stat().st_mtime_ns for path in cache_directory.glob("*.json")
+                     if path.name != "stats.json"}
+    assert len(written) == 3
+    assert {name: written[name] for name in listing_files} == listing_files
+
+
+def test_version_is_bumped_once_per_operation(repository, backend):
+    def read_version() -> int:
+        with backend.connection() as connection:
+            return connection.execute("SELECT version FROM tasks_version;").fetchone()[0]
+
+    repository.import_tasks(io.StringIO("task\na\nb\nc\n"), "csv")
+    assert read_version() == 1
+    repository.add_tasks_status([1, 2, 3], "completed")
+    assert read_version() == 2
+    repository.delete_tasks([42])
+    assert read_version() == 2
+
+
+def test_archive_moves_old_completed_tasks_in_batches(repository, backend):
+    for number in range(1, 8):
+        repository.add_task(f"task {number}")
+    complete_long_ago(backend, [1, 2, 3, 4, 5])
+    repository.add_tasks_status([6], "completed")
+
+    assert repository.archive_tasks(timedelta(days=30), batch_size=2) == 5
+    assert [task.task_id for task in repository.list_tasks()] == [6, 7]
+    assert [task.task_id for task in repository.list_tasks(include_archive=True)] == [1, 2, 3, 4, 5, 6, 7]
+    assert [task.task_id for task in repository.list_tasks("COMPLETED", include_archive=True)] == [1, 2, 3, 4, 5, 6]
+    assert repository.archive_tasks(timedelta(days=30)) == 0
+
+
+def test_archive_invalidates_cached_listings(backend):
+    repository = TaskRepository(backend, cache=TaskCache())
+    repository.add_task("done")
+    complete_long_ago(backend, [1])
+    assert len(repository.list_tasks()) == 1
+    repository.archive_tasks(timedelta(days=1))
+    assert repository.list_tasks() == []
+
+
+def test_csv_export_and_import_round_trip(repository, tmp_path):
+    repository.add_task("Plain")
+    repository.add_task("Comma, \"quotes\"\nand a line break")
+    repository.add_tasks_status([2], "completed")
+    exported = io.StringIO()
+    assert repository.export_tasks(exported, "csv") == 2
+
+    copy = TaskRepository(SQLiteBackend(str(tmp_path / "copy.db")))
+    exported.seek(0)
+    assert copy.import_tasks(exported, "csv") == 2
+    assert [task[1:] for task in copy.list_tasks()] == [task[1:] for task in repository.list_tasks()]
+
+
+def test_jsonl_export_and_import_round_trip_skips_blank_lines(repository, tmp_path):
+    repository.add_task("First")
+    repository.add_task("Ünïcode \t tab")
+    exported = io.StringIO()
+    assert repository.export_tasks(exported, "jsonl") == 2
+    lines: list = exported.getvalue().splitlines()
+    assert [json.loads(line)["task"] for line in lines] == ["First", "Ünïcode \t tab"]
+
+    copy = TaskRepository(SQLiteBackend(str(tmp_path / "copy.db")))
+    assert copy.import_tasks(io.StringIO(lines[0] + "\n\n" + lines[1] + "\n\n"), "jsonl") == 2
+    assert [task[1:] for task in copy.list_tasks()] == [task[1:] for task in repository.list_tasks()]